@@ -34,11 +34,17 @@
 
 import os
 import sys
+import gc
+import atexit
+import time
+import types
+import pickle
+import hashlib
 import datetime
 import logging
-import functools
 import platform
 import subprocess
+import concurrent.futures
 import collections
 import shutil
 #  import order seems to matter on linux. QtCore and QtSql (in metadata_db)
@@ -46,7 +52,7 @@ import shutil
 #  loading a shared library when importing them.
 from PyQt5 import QtCore
 from pathlib import Path
-from metadata_db import metadata_db
+from metadata_db import metadata_db, metadata_writer
 import google.protobuf
 import yaml
 import numpy as np
@@ -54,50 +60,320 @@ import cv2
 import SpinCamera
 import PySpin
 from SerialMonitor import SerialMonitor
-from CamtrawlServer import CamtrawlServer
+
+#  our log formats don't include the thread or process info so we skip
+#  collecting it for every log record.
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+#  use the LibYAML based loader if PyYAML was built with it. It is much faster
+#  than the pure Python loader and has the same semantics as SafeLoader.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+#  parsed YAML files are pickled to a .cache file in a user private cache
+#  directory keyed by the md5 of the file contents so warm restarts skip YAML
+#  parsing.
+_CONFIG_CACHE_EXT = '.cache'
+
+#  _SCRIPT_DIR is the directory containing this script
+_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+
+#  _SYNC_TYPES are the sensor type values that specify synchronous sensor data
+_SYNC_TYPES = frozenset(['synchronous', 'syncd', 'sync', 'synced'])
+
+#  _LOWERCASE_CAMERA_OPTIONS lists the camera options that are compared against
+#  keywords. They are converted to lower case once in GetCameraConfiguration.
+_LOWERCASE_CAMERA_OPTIONS = ('trigger_source', 'hdr_merge_method')
+
+#  _LOWERCASE_CONFIG_OPTIONS lists the (section, option) pairs in the application
+#  configuration that are compared against keywords. They are converted to lower
+#  case once in _check_config.
+_LOWERCASE_CONFIG_OPTIONS = (('application', 'output_mode'), ('sensors', 'default_type'))
+
+#  _ALL_CAMERAS is passed as the cam_list argument of the trigger signal. An
+#  empty list tells the cameras that all of them should trigger.
+_ALL_CAMERAS = []
+
+
+def _update_mapping(d, u):
+    """
+    Update a nested dictionary or similar mapping.
+
+    This is an iterative version of the recursive update from:
+    Source: https://stackoverflow.com/questions/3232943/update-value-of-a-nested-dictionary-of-varying-depth
+    Credit: Alex Martelli / Alex Telon
+
+    Non-mapping values at each level are merged with a single dict.update
+    call and nested mappings are pushed onto a stack instead of recursing.
+    The yaml loader produces plain dicts so those are checked for before
+    falling back to the slower Mapping ABC check.
+
+    CamtrawlStartup.__update duplicates this so the startup script doesn't
+    import the acquisition dependencies. Keep the two in sync.
+    """
+    stack = [(d, u)]
+    while stack:
+        dest, src = stack.pop()
+        if not src:
+            #  nothing to merge at this level
+            continue
+        leaves = {}
+        for k, v in src.items():
+            if v.__class__ is dict or isinstance(v, collections.abc.Mapping):
+                existing = dest.get(k, {})
+                if not (existing.__class__ is dict or
+                        isinstance(existing, collections.abc.Mapping)):
+                    #  if a value is None (or not a mapping), just assign the value
+                    dest[k] = v
+                else:
+                    #  otherwise keep going
+                    dest[k] = existing
+                    stack.append((existing, v))
+            else:
+                leaves[k] = v
+        dest.update(leaves)
+    return d
+
+
+def _max_image_number(image_dir):
+    '''_max_image_number returns the largest image number parsed from the file
+    names in the camera directories within image_dir or 0 if there are none.
+    Files that do not start with an image number and an underscore are skipped.
+
+    Image numbers are zero padded to a fixed width so numbers with the same
+    width compare correctly as strings. The largest number string is tracked
+    for each width and only those are converted to ints.
+    '''
+
+    max_by_width = {}
+    with os.scandir(image_dir) as cam_dirs:
+        for cam_dir in cam_dirs:
+            if not cam_dir.is_dir():
+                continue
+            with os.scandir(cam_dir.path) as img_files:
+                for img_file in img_files:
+                    #  image file names start with the image number followed by '_'.
+                    #  Only ASCII digits are accepted since isdigit alone accepts
+                    #  characters like superscripts that int rejects and other
+                    #  scripts' digits don't compare correctly as strings.
+                    prefix, sep, _ = img_file.name.partition('_')
+                    if sep and prefix.isascii() and prefix.isdigit():
+                        width = len(prefix)
+                        if prefix > max_by_width.get(width, ''):
+                            max_by_width[width] = prefix
+
+    return max((int(prefix) for prefix in max_by_width.values()), default=0)
+
+
+def _is_private(st):
+    '''_is_private returns True if the provided stat result is owned by the current
+    user and is not writable by the group or others. On Windows the cache lives in
+    the user's local app data directory, which is private to the user.
+    '''
+
+    if os.name == 'nt':
+        return True
+    return st.st_uid == os.getuid() and not (st.st_mode & 0o022)
+
+
+def _config_cache_dir():
+    '''_config_cache_dir returns the user private directory that holds the parsed
+    config cache files, creating it if needed. None is returned if the directory
+    can't be created or isn't private to the current user.
+    '''
+
+    if os.name == 'nt':
+        base_dir = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base_dir = (os.environ.get('XDG_CACHE_HOME') or
+                os.path.join(os.path.expanduser('~'), '.cache'))
+    cache_dir = os.path.join(base_dir, 'CamtrawlAcquisition')
+
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        #  lstat so a symlink in place of the directory is rejected
+        if not _is_private(os.lstat(cache_dir)):
+            return None
+    except OSError:
+        return None
+
+    return cache_dir
+
+
+def _load_yaml_cached(config_file):
+    '''_load_yaml_cached returns the parsed contents of the provided yaml file.
+    The file is read and hashed once. If the pickled cache file matches the
+    hash its contents are returned, otherwise the file is parsed and the
+    cache file is updated.
+
+    Cache files are unpickled, so they are kept in a user private cache
+    directory and are only loaded if they are owned by the current user and
+    not writable by anyone else.
+    '''
+
+    config_file = os.path.normpath(os.path.abspath(config_file))
+
+    #  read the raw file - the md5 of the contents is used to version the cache
+    with open(config_file, 'rb') as cf_file:
+        raw_config = cf_file.read()
+    md5 = hashlib.md5(raw_config).hexdigest()
+
+    #  the cache file is named using the hash of the config file path
+    cache_dir = _config_cache_dir()
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir,
+                hashlib.md5(config_file.encode('utf-8')).hexdigest() + _CONFIG_CACHE_EXT)
+    else:
+        cache_file = None
+
+    #  check the cache file
+    config = None
+    if cache_file is not None:
+        try:
+            with open(cache_file, 'rb') as c_file:
+                #  check the file we actually opened before unpickling it
+                if _is_private(os.fstat(c_file.fileno())):
+                    cache_md5, cached = pickle.load(c_file)
+                    if cache_md5 == md5:
+                        config = cached
+        except Exception:
+            #  missing, stale, or unreadable cache - we'll parse the yaml
+            pass
+
+    if config is None:
+        #  parse the yaml and try to write the cache file
+        config = yaml.load(raw_config, Loader=_YamlLoader)
+        if cache_file is not None:
+            try:
+                fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC |
+                        getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0), 0o600)
+                with os.fdopen(fd, 'wb') as c_file:
+                    pickle.dump((md5, config), c_file, protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                #  the cache directory may not be writable - this is not an error
+                pass
+
+    return config
+
+
+def _check_config(config):
+    '''_check_config checks the structure of the merged application configuration
+    and normalizes the options that are compared against keywords. This is done
+    once after the configuration is read so the setup code can index the
+    configuration directly. It returns a list of the problems found.
+    '''
+
+    problems = []
+
+    #  an empty section in the config file replaces the default values
+    for section, values in config.items():
+        if not isinstance(values, dict):
+            problems.append("Configuration section '%s' is empty or not a mapping." % (section))
+
+    #  convert the keyword options to lower case
+    for section, option in _LOWERCASE_CONFIG_OPTIONS:
+        values = config.get(section)
+        if isinstance(values, dict) and isinstance(values.get(option), str):
+            values[option] = values[option].lower()
+
+    #  installed_sensors may be empty in the config file. We'll treat that as no
+    #  sensors. Sensors with a type specified are normalized here too.
+    sensors = config.get('sensors')
+    if isinstance(sensors, dict):
+        installed = sensors.get('installed_sensors')
+        if installed is None:
+            installed = sensors['installed_sensors'] = {}
+        elif not isinstance(installed, dict):
+            problems.append("Sensor configuration 'installed_sensors' is not a mapping. " +
+                    "No sensors will be installed.")
+            installed = sensors['installed_sensors'] = {}
+        for sensor_name in list(installed):
+            sensor = installed[sensor_name]
+            if sensor is None:
+                #  an empty sensor entry is installed with the default settings
+                problems.append("Sensor '%s' configuration is empty. Using the default settings." %
+                        (sensor_name))
+                installed[sensor_name] = {}
+            elif not isinstance(sensor, dict):
+                #  we can't use this entry so we drop it
+                problems.append("Sensor '%s' configuration is not a mapping. The sensor will be ignored." %
+                        (sensor_name))
+                del installed[sensor_name]
+            elif isinstance(sensor.get('type'), str):
+                sensor['type'] = sensor['type'].lower()
+
+    return problems
+
+
+class _CopySettings(QtCore.QRunnable):
+    '''_CopySettings copies the provided settings files to the deployment's settings
+    directory. It is run in the global thread pool so setup doesn't wait on the
+    disk. Errors are logged to the provided logger.
+    '''
+
+    def __init__(self, src_files, dst_dir, logger):
+        super(_CopySettings, self).__init__()
+        self.src_files = src_files
+        self.dst_dir = dst_dir
+        self.logger = logger
+
+
+    def run(self):
+        try:
+            for src_file in self.src_files:
+                shutil.copy2(src_file, self.dst_dir)
+        except OSError:
+            #  we failed to copy the settings?
+            self.logger.error("Unable to copy settings files to %s", self.dst_dir)
 
 
 class AcquisitionBase(QtCore.QObject):
 
     # CAMERA_CONFIG_OPTIONS defines the default camera configuration options.
-    # These values are used if not specified in the configuration file.
-    CAMERA_CONFIG_OPTIONS = {'exposure_us':4000,
-                             'gain':18,
-                             'label':'Camera',
-                             'rotation':'none',
-                             'trigger_divider': 1,
-                             'sensor_binning': 1,
-                             'trigger_source': 'Software',
-                             'controller_trigger_port': 1,
-                             'hdr_enabled':False,
-                             'hdr_save_merged':False,
-                             'hdr_signal_merged':False,
-                             'hdr_merge_method':'mertens',
-                             'hdr_save_format': 'hdr',
-                             'hdr_settings':None,
-                             'hdr_response_file': None,
-                             'hdr_tonemap_saturation': 1.0,
-                             'hdr_tonemap_bias': 0.85,
-                             'hdr_tonemap_gamma': 2.0,
-                             'save_stills': True,
-                             'still_image_extension': '.jpg',
-                             'still_image_divider': 1,
-                             'jpeg_quality': 90,
-                             'image_scale': 100,
-                             'save_video': False,
-                             'video_preset': 'default',
-                             'video_force_framerate': -1,
-                             'video_frame_divider': 1,
-                             'video_scale': 100}
+    # These values are used if not specified in the configuration file. The
+    # defaults are read-only - copy them before modifying. The values must not
+    # be mappings since GetCameraConfiguration merges camera sections shallowly.
+    CAMERA_CONFIG_OPTIONS = types.MappingProxyType({'exposure_us':4000,
+                                                    'gain':18,
+                                                    'label':'Camera',
+                                                    'rotation':'none',
+                                                    'trigger_divider': 1,
+                                                    'sensor_binning': 1,
+                                                    'trigger_source': 'Software',
+                                                    'controller_trigger_port': 1,
+                                                    'hdr_enabled':False,
+                                                    'hdr_save_merged':False,
+                                                    'hdr_signal_merged':False,
+                                                    'hdr_merge_method':'mertens',
+                                                    'hdr_save_format': 'hdr',
+                                                    'hdr_settings':None,
+                                                    'hdr_response_file': None,
+                                                    'hdr_tonemap_saturation': 1.0,
+                                                    'hdr_tonemap_bias': 0.85,
+                                                    'hdr_tonemap_gamma': 2.0,
+                                                    'save_stills': True,
+                                                    'still_image_extension': '.jpg',
+                                                    'still_image_divider': 1,
+                                                    'jpeg_quality': 90,
+                                                    'image_scale': 100,
+                                                    'save_video': False,
+                                                    'video_preset': 'default',
+                                                    'video_force_framerate': -1,
+                                                    'video_frame_divider': 1,
+                                                    'video_scale': 100})
 
     #DEFAULT_VIDEO_PROFILE defines the default options for the 'default' video profile.
-    DEFAULT_VIDEO_PROFILE = {'encoder':'libx265',
-                              'file_ext':'.mp4',
-                              'preset':'fast',
-                              'crf':26,
-                              'pixel_format':'yuv420p',
-                              'max_frames_per_file': 1000,
-                              'ffmpeg_debug_out': False}
+    DEFAULT_VIDEO_PROFILE = types.MappingProxyType({'encoder':'libx265',
+                                                    'file_ext':'.mp4',
+                                                    'preset':'fast',
+                                                    'crf':26,
+                                                    'pixel_format':'yuv420p',
+                                                    'max_frames_per_file': 1000,
+                                                    'ffmpeg_debug_out': False})
 
     #  define PyQt Signals
     sensorData = QtCore.pyqtSignal(str, str, datetime.datetime, str)
@@ -106,10 +382,19 @@ class AcquisitionBase(QtCore.QObject):
     trigger = QtCore.pyqtSignal(list, int, datetime.datetime, bool, bool)
     stopServer = QtCore.pyqtSignal()
 
+    #  serverImageData forwards the latest image from each camera to the server
+    #  once per trigger
+    serverImageData = QtCore.pyqtSignal(dict)
+
     #  parameterChanged is used to respond to Get and SetParam
     #  requests from CamtrawlServer
     parameterChanged = QtCore.pyqtSignal(str, str, str, bool, str)
 
+    #  these signals pass the metadata entries to the database writer thread
+    dbAddImages = QtCore.pyqtSignal(list, list, list)
+    dbAddAsyncData = QtCore.pyqtSignal(str, str, datetime.datetime, str)
+    dbCloseWriter = QtCore.pyqtSignal()
+
     #  specify the application version
     VERSION = '4.2'
 
@@ -126,6 +411,19 @@ class AcquisitionBase(QtCore.QObject):
     #  shutting down the application.
     TEARDOWN_TRIES = 12
 
+    #  specify how long to wait (in ms) for each camera thread to finish when
+    #  shutting down the application.
+    THREAD_WAIT_MS = 5000
+
+    #  specify the maximum interval (in ms) between disk free space checks. The check
+    #  interval is adjusted between disk_free_check_int_ms and this value based on
+    #  the estimated time until the free space drops below the minimum.
+    DISK_CHECK_MAX_INT_MS = 60000
+
+    #  specify the image size (in MB) assumed when estimating the worst case disk
+    #  write rate for a camera whose image size can't be read.
+    DISK_CHECK_FRAME_MB = 64
+
     def __init__(self, config_file=None, profiles_file=None, parent=None):
 
         super(AcquisitionBase, self).__init__(parent)
@@ -149,16 +447,40 @@ class AcquisitionBase(QtCore.QObject):
         self.isTriggering = False
         self.serverThread = None
         self.server = None
+        self.dbThread = None
+        self.db_writer = None
         self.system = None
+        self._system_released = False
         self.diskStatTimer = None
+        self.disk_free_last_mb = 0
+        self.disk_check_last_ns = 0
+        self.max_write_mb_per_s = 0
         self.cameras = {}
+        self.camera_configs = {}
         self.threads = []
         self.hw_triggered_cameras = []
-        self.received = {}
+        self.camera_bits = {}
+        self.all_cameras_mask = 0
+        self.received_mask = 0
+        self.stopped_mask = 0
         self.use_db = True
+        self.pending_images = []
+        self.pending_dropped = []
+        self.pending_sensor_data = []
+        self.server_images = {}
         self.syncdSensorData = {}
-        self.readyToTrigger = {}
+        self.sync_headers = frozenset()
+        self.async_headers = frozenset()
+        self.installed_sensors = {}
         self.acqisition_teardown_tries = 0
+        self.trig_time_ns = 0
+        self.debug_enabled = False
+        self.acq_interval_ms = 200.0
+        self.trigger_period_ns = 200000000
+        self.next_trigger_ns = 0
+        self.trigger_limit = -1
+        self.shut_down_on_exit = False
+        self.sync_timeout = None
         self.serial_threads_finished = False
         self.server_finished = False
 
@@ -199,16 +521,23 @@ class AcquisitionBase(QtCore.QObject):
         #  camtrawl metadata database
         self.db = metadata_db()
 
+        #  make sure queued database entries are written and the database and
+        #  Spinnaker system are released if we exit without tearing down.
+        atexit.register(self.ExitCleanup)
+
         #  Create a SerialMonitor instance which will manage serial sensor data.
         self.serialSensors = SerialMonitor.SerialMonitor(self)
         self.serialSensors.SerialDataReceived.connect(self.SerialDataReceived)
         self.serialSensors.SerialDevicesStopped.connect(self.SerialDevicesStopped)
         self.serialSensors.SerialError.connect(self.SerialDeviceError)
                 
-        #  create the trigger timer
+        #  create the trigger timer. This is a repeating timer that runs at the trigger
+        #  interval. When triggering is started, the timer is started with a longer
+        #  interval to give the cameras time to get ready and the interval is set
+        #  to the trigger interval in TriggerCameras.
         self.triggerTimer = QtCore.QTimer(self)
         self.triggerTimer.timeout.connect(self.TriggerCameras)
-        self.triggerTimer.setSingleShot(True)
+        self.triggerTimer.setSingleShot(False)
         self.triggerTimer.setTimerType(QtCore.Qt.PreciseTimer)
 
         #  create the trigger timer
@@ -226,10 +555,7 @@ class AcquisitionBase(QtCore.QObject):
         #  continue the setup after QtCore.QCoreApplication.exec_() is called
         #  by using a timer to call AcquisitionSetup. This ensures that the
         #  application event loop is running when AcquisitionSetup is called.
-        startTimer = QtCore.QTimer(self)
-        startTimer.timeout.connect(self.AcquisitionSetup)
-        startTimer.setSingleShot(True)
-        startTimer.start(0)
+        QtCore.QTimer.singleShot(0, self.AcquisitionSetup)
 
 
     def AcquisitionSetup(self):
@@ -251,34 +577,42 @@ class AcquisitionBase(QtCore.QObject):
         #  have any default values and pass in an empty dict.
         self.video_profiles = self.ReadConfig(self.profiles_file, {})
 
+        #  check the configuration and normalize the keyword options. The problems
+        #  are logged once the log file has been created.
+        config_problems = _check_config(self.configuration)
+
+        #  keep a reference to the installed sensors config for the sensor data slots.
+        #  Sensors are added to this dict in place so the reference stays current.
+        self.installed_sensors = self.configuration['sensors']['installed_sensors']
+
+        #  get references to the application and acquisition config sections
+        app_cfg = self.configuration['application']
+        acq_cfg = self.configuration['acquisition']
+
         #  set up the application paths
-        if self.configuration['application']['output_mode'].lower() == 'combined':
-            #  This is a combined deployment - we will not create a deployment directory
-            self.base_dir = os.path.normpath(self.configuration['application']['output_path'])
-        else:
+        base_path = Path(app_cfg['output_path'])
+        if app_cfg['output_mode'] != 'combined':
             #  If not 'combined' we log data in separate deployment folders. Deployment folders
             #  are named Dyymmdd-Thhmmss where the date and time are derived from the application
-            #  start time.
-            self.base_dir = os.path.normpath(self.configuration['application']['output_path'] +
-                    os.sep + start_time_string)
+            #  start time. Combined deployments log directly to the output path.
+            base_path = base_path / start_time_string
+        self.base_dir = str(base_path)
 
         #  create the paths to our logs, images, and settings directories
-        self.log_dir = os.path.normpath(self.base_dir + os.sep + 'logs')
-        self.image_dir = os.path.normpath(self.base_dir + os.sep + 'images')
-        settings_dir = os.path.normpath(self.base_dir + os.sep + 'settings')
+        self.log_dir = str(base_path / 'logs')
+        self.image_dir = str(base_path / 'images')
+        settings_dir = str(base_path / 'settings')
+        logfile_name = str(base_path / 'logs' / (start_time_string + '.log'))
 
         #  set up logging
         try:
-            logfile_name = self.log_dir + os.sep + start_time_string + '.log'
-
             #  make sure we have a directory to log to
-            if not os.path.exists(self.log_dir):
-                os.makedirs(self.log_dir)
+            os.makedirs(self.log_dir, exist_ok=True)
 
             #  create the logger
             self.logger = logging.getLogger('Acquisition')
             self.logger.propagate = False
-            self.logger.setLevel(self.configuration['application']['log_level'])
+            self.logger.setLevel(app_cfg['log_level'])
             fileHandler = logging.FileHandler(logfile_name)
             formatter = logging.Formatter('%(asctime)s : %(levelname)s - %(message)s')
             fileHandler.setFormatter(formatter)
@@ -288,8 +622,14 @@ class AcquisitionBase(QtCore.QObject):
             consoleLogger.setFormatter(consoleformatter)
             self.logger.addHandler(consoleLogger)
 
-        except:
-            #  we failed to open the log file - bail
+            #  keep a reference to the bound debug method for the per-image slots
+            #  and note if debug logging is enabled so we can skip formatting
+            #  debug messages that will be discarded.
+            self.log_debug = self.logger.debug
+            self.debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
+        except (OSError, ValueError, TypeError):
+            #  we failed to open the log file or the log level is invalid - bail
             print("CRITICAL ERROR: Unable to create log file " + logfile_name)
             print("Application exiting...")
             QtCore.QCoreApplication.instance().quit()
@@ -297,11 +637,10 @@ class AcquisitionBase(QtCore.QObject):
 
         #  make sure we have a directory to write images to
         try:
-            if not os.path.exists(self.image_dir):
-                os.makedirs(self.image_dir)
-        except:
+            os.makedirs(self.image_dir, exist_ok=True)
+        except OSError:
             #  if we can't create the logging dir we bail
-            self.logger.critical("Unable to create image logging directory %s." % self.image_dir)
+            self.logger.critical("Unable to create image logging directory %s.", self.image_dir)
             self.logger.critical("Application exiting...")
             QtCore.QCoreApplication.instance().quit()
             return
@@ -311,15 +650,16 @@ class AcquisitionBase(QtCore.QObject):
         try:
             #  make sure we have a settings directory. Assume that if the
             #  settings folder exists, we have already copied the files.
-            if not os.path.exists(settings_dir):
-                os.makedirs(settings_dir)
-
-                #  copy the settings and profiles files
-                shutil.copy2(self.config_file, settings_dir)
-                shutil.copy2(self.profiles_file, settings_dir)
-        except:
+            os.makedirs(settings_dir)
+
+            #  copy the settings and profiles files in the background
+            QtCore.QThreadPool.globalInstance().start(_CopySettings(
+                    [self.config_file, self.profiles_file], settings_dir, self.logger))
+        except FileExistsError:
+            pass
+        except OSError:
             #  we failed to copy the settings?
-            self.logger.warning("Unable to copy settings files to " + settings_dir)
+            self.logger.error("Unable to copy settings files to %s", settings_dir)
 
         #  log file is set up and directories created. Get some basic info into the logs
         self.logger.info("Camtrawl Acquisition Starting...")
@@ -327,71 +667,100 @@ class AcquisitionBase(QtCore.QObject):
         try:
             #  set up the camera interface
             self.system = PySpin.System.GetInstance()
-        except:
-            #  if we can't create the logging dir we bail
+        except PySpin.SpinnakerException as e:
+            #  if we can't get the system instance we bail
             self.logger.critical("Error obtaining PySpin system instance. Have you installed the " +
                     "Spinnaker SDK and PySpin correctly?")
+            self.logger.critical("  Error: %s", e)
             self.logger.critical("Application exiting...")
             QtCore.QCoreApplication.instance().quit()
             return
 
         #  report versions
-        self.logger.info('Platform: %s %s' % (platform.system(), platform.release()))
-        self.logger.info('Python version: %s' % (sys.version))
-        self.logger.info('Numpy version: %s' % (np.__version__))
-        self.logger.info('OpenCV version: %s' % (cv2.__version__))
-        self.logger.info('protobuf version: %s' % (google.protobuf.__version__))
-        self.logger.info('PyQt5 version: %s' % (QtCore.QT_VERSION_STR))
+        self.logger.info('Platform: %s %s', platform.system(), platform.release())
+        self.logger.info('Python version: %s', sys.version)
+        self.logger.info('Numpy version: %s', np.__version__)
+        self.logger.info('OpenCV version: %s', cv2.__version__)
+
+        #  make sure OpenCV uses its optimized (SIMD) code paths. The build info
+        #  lists the CPU features OpenCV was built with.
+        cv2.setUseOptimized(True)
+        if self.debug_enabled:
+            self.log_debug('OpenCV build information: %s', cv2.getBuildInformation())
+        self.logger.info('protobuf version: %s', google.protobuf.__version__)
+        self.logger.info('PyQt5 version: %s', QtCore.QT_VERSION_STR)
+        self.logger.info('PyYAML version: %s  Loader: %s', yaml.__version__,
+                _YamlLoader.__name__)
         version = self.system.GetLibraryVersion()
-        self.logger.info('Spinnaker/PySpin library version: %d.%d.%d.%d' % (version.major,
-                version.minor, version.type, version.build))
-        self.logger.info("CamtrawlAcquisition version: " + self.VERSION)
+        self.logger.info('Spinnaker/PySpin library version: %d.%d.%d.%d', version.major,
+                version.minor, version.type, version.build)
+        self.logger.info("CamtrawlAcquisition version: %s", self.VERSION)
 
         #  note the config files we loaded
-        self.logger.info("Configuration file loaded: " + self.config_file)
-        self.logger.info("Profiles file loaded: " + self.profiles_file)
-        self.logger.info("Logging data to: " + self.base_dir)
+        self.logger.info("Configuration file loaded: %s", self.config_file)
+        self.logger.info("Profiles file loaded: %s", self.profiles_file)
+        self.logger.info("Logging data to: %s", self.base_dir)
+        for problem in config_problems:
+            self.logger.error(problem)
 
         #  set the default_is_synchronous sensor data property
-        if self.configuration['sensors']['default_type'].lower in ['synchronous', 'syncd', 'sync', 'synced']:
+        if self.configuration['sensors']['default_type'] in _SYNC_TYPES:
             self.default_is_synchronous = True
         else:
             self.default_is_synchronous = False
 
-        #  open/create the image metadata database file
+        #  open/create the image metadata database file and start the writer thread
         self.OpenDatabase()
+        if self.use_db and self.db.is_open:
+            self.StartDbWriter()
 
         #  log the acquisition rate and max image count
-        self.logger.info("Acquisition Rate: %d images/sec   Max image count: %d" %
-                (self.configuration['acquisition']['trigger_rate'],
-                self.configuration['acquisition']['trigger_limit']))
+        self.logger.info("Acquisition Rate: %d images/sec   Max image count: %d",
+                acq_cfg['trigger_rate'], acq_cfg['trigger_limit'])
+
+        #  cache the values used when each trigger completes so we aren't digging
+        #  through the configuration dict every trigger
+        self.acq_interval_ms = 1000.0 / acq_cfg['trigger_rate']
+        self.trigger_period_ns = int(round(1e9 / acq_cfg['trigger_rate']))
+        self.trigger_limit = acq_cfg['trigger_limit']
+        self.shut_down_on_exit = app_cfg['shut_down_on_exit']
+
+        #  synced sensor data older than sync_timeout is not written. None disables
+        #  the check.
+        sync_timeout_secs = self.configuration['sensors']['synchronous_timeout_secs']
+        if sync_timeout_secs < 0:
+            self.sync_timeout = None
+        else:
+            self.sync_timeout = datetime.timedelta(seconds=sync_timeout_secs)
 
         #  check if we should check the available free space on our destination device.
-        if self.configuration['application']['disk_free_monitor']:
+        if app_cfg['disk_free_monitor']:
 
             #  get the starting free space and report
             disk_stats = shutil.disk_usage(self.image_dir)
             disk_free_mb = disk_stats.free / 1024 / 1024
 
             #  check if we even have enough space to start
-            if disk_free_mb <= self.configuration['application']['disk_free_min_mb']:
+            if disk_free_mb <= app_cfg['disk_free_min_mb']:
                 #  no, don't got the space
                 self.disk_ok = False
-                self.logger.critical("CRITICAL ERROR: Free space: %d MB is less than the " % (disk_free_mb) +
-                    "minimum allowed %d MB" % (self.configuration['application']['disk_free_min_mb']))
+                self.logger.critical("CRITICAL ERROR: Free space: %d MB is less than the " +
+                    "minimum allowed %d MB", disk_free_mb, app_cfg['disk_free_min_mb'])
                 self.logger.critical("Application exiting due to lack of free disk space")
             else:
                 #  free space is greater than min
                 self.disk_ok = True
                 self.logger.info("Starting to monitor disk free space. Starting free space: " +
-                        "%d MB. Minimum free space set to: %d MB" % (disk_free_mb,
-                        self.configuration['application']['disk_free_min_mb']))
+                        "%d MB. Minimum free space set to: %d MB", disk_free_mb,
+                        app_cfg['disk_free_min_mb'])
 
                 #  Create a timer to periodically check the disk free space
+                self.disk_free_last_mb = disk_free_mb
+                self.disk_check_last_ns = time.monotonic_ns()
                 self.diskStatTimer = QtCore.QTimer(self)
                 self.diskStatTimer.timeout.connect(self.CheckDiskFreeSpace)
                 self.diskStatTimer.setSingleShot(False)
-                self.diskStatTimer.start(self.configuration['application']['disk_free_check_int_ms'])
+                self.diskStatTimer.start(app_cfg['disk_free_check_int_ms'])
         else:
             #  we're not checking the disk free space
             self.disk_ok = True
@@ -402,12 +771,8 @@ class AcquisitionBase(QtCore.QObject):
         #  NMEA like ASCII data terminated by LF or CR/LF. The sensors can be connected to
         #  a local serial port, or a network based serial server or a simple network socket.
         
-        #  first check if the installed_sensors section of the .yml config file is empty.
-        #  This is allowed, but it results in self.configuration['sensors']['installed_sensors']
-        #  being set to None. We need it set to an empty dict. This is not an issue if it
-        #  omitted as it is initialized to an empty dict.
-        if self.configuration['sensors']['installed_sensors'] is None:
-             self.configuration['sensors']['installed_sensors'] = {}
+        #  An empty installed_sensors section is allowed. It was converted to an
+        #  empty dict in _check_config.
         
         #  now set up sensors if any are specified in the yml file
         if len(self.configuration['sensors']['installed_sensors']) > 0:
@@ -417,8 +782,8 @@ class AcquisitionBase(QtCore.QObject):
                 #  determine if the type for this sensor is provided - if so, set the is_synchronous
                 #  key so we know if it is synced or not when we log it.
                 if 'type' in self.configuration['sensors']['installed_sensors'][sensor_name]:
-                    if (self.configuration['sensors']['installed_sensors'][sensor_name]['type'].lower() in 
-                            ['synced', 'sync', 'synchronous']):
+                    if (self.configuration['sensors']['installed_sensors'][sensor_name]['type'] in
+                            _SYNC_TYPES):
                         self.configuration['sensors']['installed_sensors'][sensor_name]['is_synchronous'] = True
                     else:
                         self.configuration['sensors']['installed_sensors'][sensor_name]['is_synchronous'] = False
@@ -457,7 +822,7 @@ class AcquisitionBase(QtCore.QObject):
                 if 'serial_baud' in self.configuration['sensors']['installed_sensors'][sensor_name]:
                     try:
                         baud = int(self.configuration['sensors']['installed_sensors'][sensor_name]['serial_baud'])
-                    except:
+                    except (ValueError, TypeError):
                         #  if baud is not a number, default to 4800
                         baud = 4800 
                 else:
@@ -471,15 +836,18 @@ class AcquisitionBase(QtCore.QObject):
                         self.serialSensors.addDevice(sensor_name, port, baud, 'None', '', 0)
                         #  and try to open the port
                         self.serialSensors.startMonitoring(devices=sensor_name)
-                        self.logger.info("   added sensor: " + sensor_name +
-                                " // port:" + port + " // baud:" + str(baud))
+                        self.logger.info("   added sensor: %s // port:%s // baud:%s",
+                                sensor_name, port, baud)
                         
                     except Exception as e:
                         #  ran into an issue with the serial port
-                        self.logger.error("   Error opening serial port for sensor: " + sensor_name +
-                                " // port:" + port + " // baud:" + str(baud))
-                        self.logger.error("   " + str(e))            
+                        self.logger.error("   Error opening serial port for sensor: %s // port:%s // baud:%s",
+                                sensor_name, port, baud)
+                        self.logger.error("   %s", e)            
             
+        #  build the sets of synced and async headers used by SensorDataAvailable
+        self.UpdateSensorHeaders()
+
         #  continue camera setup in another method so we can override that method
         #  in a subclass and allow for additional pre-camera setup.
         self.AcquisitionSetup2()
@@ -557,12 +925,51 @@ class AcquisitionBase(QtCore.QObject):
 
             #  Log that we're stopping because we're out of disk space
             self.logger.critical("The system is stopping because the data disk is full.")
-            self.logger.critical("  Free space: %d MB is less than the " % (disk_free_mb) +
-                    "minimum allowed %d MB" % (self.configuration['application']['disk_free_min_mb']))
+            self.logger.critical("  Free space: %d MB is less than the " +
+                    "minimum allowed %d MB", disk_free_mb,
+                    self.configuration['application']['disk_free_min_mb'])
 
             #  Stop acquisition and close the app
             self.StopAcquisition(exit_app=True,
                     shutdown_on_exit=self.configuration['application']['shut_down_on_exit'])
+        else:
+            #  schedule the next check
+            self.diskStatTimer.start(self.NextDiskCheckInterval(disk_free_mb))
+
+
+    def NextDiskCheckInterval(self, disk_free_mb):
+        '''
+        NextDiskCheckInterval returns the interval in ms until the next disk free
+        space check. The rate the free space is dropping is estimated from the last
+        check and the next check is scheduled at half of the projected time until
+        the free space drops below the minimum. The interval is also capped at half
+        the time it would take to fill the remaining space at the worst case write
+        rate of the cameras so a sudden burst of writes can't blow past the minimum.
+        The interval is kept between the configured disk_free_check_int_ms and
+        DISK_CHECK_MAX_INT_MS.
+        '''
+
+        min_int_ms = self.configuration['application']['disk_free_check_int_ms']
+        now_ns = time.monotonic_ns()
+        elapsed_ms = (now_ns - self.disk_check_last_ns) / 1000000.
+        used_mb = self.disk_free_last_mb - disk_free_mb
+        self.disk_free_last_mb = disk_free_mb
+        self.disk_check_last_ns = now_ns
+        headroom_mb = disk_free_mb - self.configuration['application']['disk_free_min_mb']
+
+        if used_mb > 0 and elapsed_ms > 0:
+            #  project the time until we reach the minimum
+            interval_ms = int(headroom_mb * elapsed_ms / used_mb / 2)
+        else:
+            #  free space isn't dropping - back off
+            interval_ms = self.diskStatTimer.interval() * 2
+
+        #  don't back off past the time it would take to fill the headroom writing
+        #  at the worst case rate
+        if self.max_write_mb_per_s > 0:
+            interval_ms = min(interval_ms, int(headroom_mb * 1000 / self.max_write_mb_per_s / 2))
+
+        return max(min_int_ms, min(self.DISK_CHECK_MAX_INT_MS, interval_ms))
 
 
     def ConfigureCameras(self):
@@ -572,18 +979,30 @@ class AcquisitionBase(QtCore.QObject):
         """
         #  initialize some properties
         self.cameras = {}
+        self.camera_configs = {}
         self.threads = []
-        self.received = {}
+        self.camera_bits = {}
+        self.all_cameras_mask = 0
         self.this_images = 1
         self.controller_port = {}
         self.hw_triggered_cameras = []
         self.hwTriggered = False
+        camera_rows = []
+        image_ext = None
+        video_ext = None
+        max_write_mb_per_s = 0
 
         # Retrieve list of cameras from the system
         self.logger.info('Getting available cameras...')
         cam_list = self.system.GetCameras()
         self.num_cameras = cam_list.GetSize()
 
+        #  get our own references to the cameras and release the camera list.
+        #  SpinCamera holds a reference to its camera so the list isn't needed.
+        spin_cams = [cam_list.GetByIndex(i) for i in range(self.num_cameras)]
+        cam_list.Clear()
+        del cam_list
+
         if (self.num_cameras == 0):
             self.logger.critical("No cameras found!")
             return False
@@ -592,12 +1011,30 @@ class AcquisitionBase(QtCore.QObject):
             self.logger.info('1 camera found.')
         else:
             s = 'cameras'
-            self.logger.info('%d cameras found.' % self.num_cameras)
+            self.logger.info('%d cameras found.', self.num_cameras)
 
-        self.logger.info("Configuring " + s + ":")
+        self.logger.info("Configuring %s:", s)
 
-        #  work thru the list of discovered cameras
-        for cam in cam_list:
+        #  get the system trigger rate which is used as the default video framerate
+        trig_rate = self.configuration['acquisition']['trigger_rate']
+
+        #  video profiles merged with the defaults keyed by preset name
+        preset_profiles = {}
+
+        #  get the ffmpeg path. Paths relative to the current directory are taken to be
+        #  relative to the directory containing this script. Empty/None assumes ffmpeg
+        #  is on the system path
+        ffmpeg_path = self.configuration['application']['ffmpeg_path']
+        if ffmpeg_path in [None, '']:
+            ffmpeg_path = None
+        else:
+            if ffmpeg_path[0:2] in ['./', '.\\']:
+                ffmpeg_path = os.path.join(_SCRIPT_DIR, ffmpeg_path)
+            ffmpeg_path = os.path.normpath(ffmpeg_path)
+
+        #  create our SpinCamera objects and get their configurations
+        configured_cams = []
+        for cam in spin_cams:
 
             #  create an instance of our spin_camera class
             sc = SpinCamera.SpinCamera(cam)
@@ -609,206 +1046,183 @@ class AcquisitionBase(QtCore.QObject):
 
             if add_camera:
                 #  we have an entry for this camera so we'll use it
-                self.logger.info("  Adding: " + sc.camera_name)
-
-                #  set up the options for saving image data
-                image_options = {'file_ext':config['still_image_extension'],
-                                 'jpeg_quality':config['jpeg_quality'],
-                                 'scale':config['image_scale']}
-
-                #  create the default video profile
-                video_profile = AcquisitionBase.DEFAULT_VIDEO_PROFILE
-
-                #  update it with the options from this camera's config
-                if config['video_preset'] in self.video_profiles:
-                    #  update the video profile dict with the preset values
-                    #video_profile.update(self.video_profiles[config['video_preset']])
-                    video_profile = self.video_profiles[config['video_preset']]
-
-                #  insert the scaling factor into the video profile
-                video_profile['scale'] = config['video_scale']
-
-                #  set the video framerate - framerate (in frames/sec) is passed to the
-                #  video encoder when recording video files.
-                if config['video_force_framerate'] > 0:
-                    #  the user has chosen to override the system acquisition rate
-                    video_profile['framerate'] = config['video_force_framerate']
-                else:
-                    #  use the system acquisition rate as the video framerate
-                    video_profile['framerate'] = self.configuration['acquisition']['trigger_rate']
-
-                #  insert the ffmpeg path to the video profile. Convert relative paths to
-                #  absolute. Empty/None assumes ffmpeg is on the system path
-                if self.configuration['application']['ffmpeg_path'] in [None, '']:
-                    video_profile['ffmpeg_path'] = None
-                else:
-                    if self.configuration['application']['ffmpeg_path'][0:1] in ['./', '.\\']:
-                        #  get the directory containing this script
-                        ffpath = functools.reduce(lambda l,r: l + os.path.sep + r,
-                                os.path.dirname(os.path.realpath(__file__)).split(os.path.sep))
-                    else:
-                        ffpath = self.configuration['application']['ffmpeg_path']
-                    video_profile['ffmpeg_path'] = os.path.normpath(ffpath)
+                configured_cams.append((sc, config))
+            else:
+                #  There is no default section and no camera specific section
+                #  so we skip this camera
+                self.logger.info("  Skipped camera: %s. No configuration entry found.",
+                        sc.camera_name)
+
+        #  release our references to the cameras. The configured cameras are held
+        #  by their SpinCamera objects and the skipped cameras are released now.
+        del spin_cams, cam, sc
+
+        #  set the camera parameters. This requires a number of round trips to each
+        #  camera so the cameras are configured in parallel. The log messages are
+        #  returned so they can be logged in order below.
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, len(configured_cams))) as executor:
+            camera_logs = list(executor.map(lambda c: self.SetCameraParameters(*c),
+                    configured_cams))
+
+        #  work thru the list of configured cameras
+        for (sc, config), camera_log in zip(configured_cams, camera_logs):
+
+            self.logger.info("  Adding: %s", sc.camera_name)
+
+            #  set up the options for saving image data
+            image_options = {'file_ext':config['still_image_extension'],
+                             'jpeg_quality':config['jpeg_quality'],
+                             'scale':config['image_scale']}
+
+            #  create this camera's video profile by merging the preset values (if
+            #  any) with the default video profile. Each preset is merged once and
+            #  cameras get a copy so we don't modify the profiles shared between cameras.
+            preset = config['video_preset']
+            if preset not in preset_profiles:
+                preset_profiles[preset] = {**AcquisitionBase.DEFAULT_VIDEO_PROFILE,
+                        **self.video_profiles.get(preset, {})}
+            video_profile = dict(preset_profiles[preset])
+
+            #  insert the scaling factor into the video profile
+            video_profile['scale'] = config['video_scale']
+
+            #  set the video framerate - framerate (in frames/sec) is passed to the
+            #  video encoder when recording video files.
+            if config['video_force_framerate'] > 0:
+                #  the user has chosen to override the system acquisition rate
+                video_profile['framerate'] = config['video_force_framerate']
+            else:
+                #  use the system acquisition rate as the video framerate
+                video_profile['framerate'] = trig_rate
 
-                #  add or update this camera in the database
-                if self.use_db:
-                    link_speed = 0
-                    if 'DeviceCurrentSpeed' in sc.device_info:
-                        link_speed =  sc.device_info['DeviceCurrentSpeed']
-                    elif 'DeviceLinkSpeed' in sc.device_info:
-                        link_speed = sc.device_info['DeviceLinkSpeed']
-                    self.db.update_camera(sc.camera_name, sc.device_info['DeviceID'], sc.camera_id,
-                            config['label'], config['rotation'], sc.device_info['DeviceVersion'],
-                            link_speed)
-
-                # Set the camera's label
-                sc.label = config['label']
-
-                #  set the camera trigger and saving dividers
-                sc.save_stills = config['save_stills']
-                sc.save_stills_divider = config['still_image_divider']
-                sc.save_video = config['save_video']
-                sc.save_video_divider = config['video_frame_divider']
-                sc.trigger_divider = config['trigger_divider']
-                self.logger.info(('    %s: trigger divider: %d  save image divider: %d' +
-                        '  save frame divider: %d') % (sc.camera_name, sc.trigger_divider,
-                        sc.save_stills_divider, sc.save_video_divider))
-
-                #  set up triggering
-                if config['trigger_source'].lower() == 'hardware':
-                    #  set up the camera to use hardware triggering
-                    sc.set_camera_trigger('Hardware')
-                    self.logger.info('    %s: Hardware triggering enabled.' % (sc.camera_name))
-
-                    #  if any cameras are hardware triggered we set hwTriggered to True
-                    self.hwTriggered = True
-
-                    #  We need to keep a list of hardware triggered cameras so we can store
-                    #  some state information about them when triggering. Add this camera
-                    #  to the list.
-                    self.hw_triggered_cameras.append(sc)
+            #  insert the ffmpeg path to the video profile.
+            video_profile['ffmpeg_path'] = ffmpeg_path
 
-                else:
-                    #  set up the camera for software triggering
-                    sc.set_camera_trigger('Software')
-                    self.logger.info('    %s: Software triggering enabled.' % (sc.camera_name))
-
-                # This should probably be set on the camera to ensure the line is inverted
-                # when the camera starts up.
-                #ok = sc.set_strobe_trigger(1)
-
-                #  set the camera exposure, gain, and rotation
-                sc.set_exposure(config['exposure_us'])
-                sc.set_gain(config['gain'])
-                sc.rotation = config['rotation']
-                self.logger.info('    %s: label: %s  gain: %d  exposure_us: %d  rotation:%s' %
-                        (sc.camera_name, config['label'], sc.get_gain(), sc.get_exposure(),
-                        config['rotation']))
-
-                #  set the sensor binning
-                sc.set_binning(config['sensor_binning'])
-                binning = sc.get_binning()
-                self.logger.info('    %s: Sensor binning set to %i x %i' %
-                        (sc.camera_name, binning, binning))
-
-                #  set up HDR if configured
+            #  collect this camera's info - the database is updated after the loop
+            if self.use_db:
+                link_speed = 0
+                if 'DeviceCurrentSpeed' in sc.device_info:
+                    link_speed =  sc.device_info['DeviceCurrentSpeed']
+                elif 'DeviceLinkSpeed' in sc.device_info:
+                    link_speed = sc.device_info['DeviceLinkSpeed']
+                camera_rows.append((sc.camera_name, sc.device_info['DeviceID'], sc.camera_id,
+                        config['label'], config['rotation'], sc.device_info['DeviceVersion'],
+                        link_speed))
+
+            # Set the camera's label
+            sc.label = config['label']
+
+            #  set the camera trigger and saving dividers
+            sc.save_stills = config['save_stills']
+            sc.save_stills_divider = config['still_image_divider']
+            sc.save_video = config['save_video']
+            sc.save_video_divider = config['video_frame_divider']
+            sc.trigger_divider = config['trigger_divider']
+            self.logger.info('    %s: trigger divider: %d  save image divider: %d' +
+                    '  save frame divider: %d', sc.camera_name, sc.trigger_divider,
+                    sc.save_stills_divider, sc.save_video_divider)
+
+            #  log the camera parameter results
+            for level, msg in camera_log:
+                self.logger.log(level, msg)
+
+            #  if any cameras are hardware triggered we set hwTriggered to True. We
+            #  need to keep a list of hardware triggered cameras so we can store
+            #  some state information about them when triggering.
+            if config['trigger_source'] == 'hardware':
+                self.hwTriggered = True
+                self.hw_triggered_cameras.append(sc)
+
+            #  create a thread for this camera to run in
+            thread = QtCore.QThread()
+            self.threads.append(thread)
+
+            #  move the camera to that thread
+            sc.moveToThread(thread)
+
+            #  connect up our signals
+            sc.imageData.connect(self.CamImageAcquired)
+            sc.triggerComplete.connect(self.CamTriggerComplete)
+            sc.error.connect(self.LogCamError)
+            sc.cameraDebug.connect(self.LogCamDebug)
+            sc.acquisitionStarted.connect(self.AcquisitionStarted)
+            sc.acquisitionStopped.connect(self.AcquisitionStopped)
+            #  signals to the camera are explicitly queued so they are always posted
+            #  to the camera thread's event loop and never invoked on our stack.
+            self.trigger.connect(sc.trigger, QtCore.Qt.QueuedConnection)
+            self.stopAcquiring.connect(sc.stop_acquisition, QtCore.Qt.QueuedConnection)
+            self.startAcquiring.connect(sc.start_acquisition, QtCore.Qt.QueuedConnection)
+
+            #  these signals handle the cleanup when we're done
+            sc.acquisitionStopped.connect(thread.quit)
+            thread.finished.connect(sc.deleteLater)
+            thread.finished.connect(thread.deleteLater)
+
+            #  and start the thread
+            thread.start()
+
+            #  add this camera to our dict of cameras and assign it a bit in
+            #  the masks used to track the trigger and stop responses
+            self.cameras[sc.camera_name] = sc
+            self.camera_bits[sc.camera_name] = 1 << len(self.camera_bits)
+            self.all_cameras_mask |= self.camera_bits[sc.camera_name]
+
+            if config['save_stills']:
+                self.logger.info('    %s: Saving stills as %s  Scale: %i', sc.camera_name,
+                        image_options['file_ext'], image_options['scale'])
+                if image_ext is None:
+                    image_ext = image_options['file_ext']
+
+            if config['save_video']:
+                self.logger.info('    %s: Saving video as %s  Video profile: %s', sc.camera_name,
+                        video_profile['file_ext'], config['video_preset'])
+                if video_ext is None:
+                    video_ext = video_profile['file_ext']
+
+            #  issue a warning if a camera is not saving any image data
+            if config['save_video'] or config['save_stills']:
+                self.logger.info('    %s: Image data will be written to: %s', sc.camera_name,
+                            os.path.join(self.image_dir, sc.camera_name))
+            else:
+                self.logger.warning('    %s: WARNING: Both video and still saving is disabled. ' +
+                        'NO IMAGE DATA WILL BE RECORDED', sc.camera_name)
+
+            #  estimate the worst case rate this camera writes image data for the disk
+            #  free space checks. Every triggered frame is assumed to be saved as a full
+            #  size uncompressed BGR image.
+            if config['save_video'] or config['save_stills']:
+                try:
+                    frame_mb = sc.cam.Width.GetValue() * sc.cam.Height.GetValue() * 3 / 1048576.
+                except PySpin.SpinnakerException:
+                    frame_mb = self.DISK_CHECK_FRAME_MB
                 if config['hdr_enabled']:
-                    ok = sc.enable_hdr_mode()
-                    if ok:
-                        self.logger.info('    %s: Enabling HDR: OK' % (sc.camera_name))
-                        if config['hdr_settings'] is not None:
-                            self.logger.info('    %s: Setting HDR Params: %s' % (sc.camera_name,
-                                    config['hdr_settings']))
-                            sc.set_hdr_settings(config['hdr_settings'])
-                        else:
-                            self.logger.info('    %s: HDR Params not provided. Using values from camera.' %
-                                    (sc.camera_name))
-
-                        sc.hdr_save_merged = config['hdr_save_merged']
-                        sc.hdr_signal_merged = config['hdr_signal_merged']
-                        sc.hdr_merge_method = config['hdr_merge_method']
-                        sc.hdr_tonemap_saturation = config['hdr_tonemap_saturation']
-                        sc.hdr_tonemap_bias = config['hdr_tonemap_bias']
-                        sc.hdr_tonemap_gamma = config['hdr_tonemap_gamma']
-
-                        #  check if there is a camera response file to load
-                        if config['hdr_response_file'] in ['none', 'None', 'NONE']:
-                            config['hdr_response_file'] = None
-                        if config['hdr_response_file'] is not None:
-                            try:
-                                sc.load_hdr_reponse(config['hdr_response_file'])
-                                self.logger.info('    %s: Loaded HDR response file: %s' %
-                                        (sc.camera_name, config['hdr_response_file']))
-                            except:
-                                self.logger.error('    %s: Failed to load HDR response file: %s' %
-                                        (sc.camera_name, config['hdr_response_file']))
-                    else:
-                        self.logger.error('    %s: Failed to enable HDR.' % (sc.camera_name))
-                else:
-                    sc.disable_hdr_mode()
-
-                #  create a thread for this camera to run in
-                thread = QtCore.QThread()
-                self.threads.append(thread)
-
-                #  move the camera to that thread
-                sc.moveToThread(thread)
-
-                #  connect up our signals
-                sc.imageData.connect(self.CamImageAcquired)
-                sc.triggerComplete.connect(self.CamTriggerComplete)
-                sc.error.connect(self.LogCamError)
-                sc.cameraDebug.connect(self.LogCamDebug)
-                sc.acquisitionStarted.connect(self.AcquisitionStarted)
-                sc.acquisitionStopped.connect(self.AcquisitionStopped)
-                self.trigger.connect(sc.trigger)
-                self.stopAcquiring.connect(sc.stop_acquisition)
-                self.startAcquiring.connect(sc.start_acquisition)
-
-                #  these signals handle the cleanup when we're done
-                sc.acquisitionStopped.connect(thread.quit)
-                thread.finished.connect(sc.deleteLater)
-                thread.finished.connect(thread.deleteLater)
-
-                #  and start the thread
-                thread.start()
-
-                #  add this camera to our list of cameras and set the image
-                #  received state to false
-                self.cameras[sc.camera_name] = sc
-                self.received[sc.camera_name] = False
-
-                if config['save_stills']:
-                    self.logger.info('    %s: Saving stills as %s  Scale: %i' % (sc.camera_name,
-                            image_options['file_ext'], image_options['scale']))
-                    if self.use_db:
-                        #  update the deployment_data table with the image file type
-                        self.db.set_image_extension(image_options['file_ext'])
-
-                if config['save_video']:
-                    self.logger.info('    %s: Saving video as %s  Video profile: %s' % (sc.camera_name,
-                            video_profile['file_ext'], config['video_preset']))
-                    if self.use_db:
-                        #  update the deployment_data table with the video file type
-                        self.db.set_video_extension(video_profile['file_ext'])
-
-                #  issue a warning if a camera is not saving any image data
-                if config['save_video'] or config['save_stills']:
-                    self.logger.info('    %s: Image data will be written to: %s' % (sc.camera_name,
-                                self.image_dir + os.sep + sc.camera_name))
-                else:
-                    self.logger.warning('    %s: WARNING: Both video and still saving is disabled. ' %
-                            (sc.camera_name) + 'NO IMAGE DATA WILL BE RECORDED')
+                    #  HDR saves each exposure plus the merged image
+                    frame_mb *= len(sc.hdr_parameters) + 1
+                max_write_mb_per_s += frame_mb * trig_rate / max(1, config['trigger_divider'])
 
-                #  emit the startAcquiring signal to start the cameras
-                self.startAcquiring.emit([sc], self.image_dir, config['save_stills'],
-                        image_options, config['save_video'], video_profile)
+            #  emit the startAcquiring signal to start the cameras
+            self.startAcquiring.emit([sc], self.image_dir, config['save_stills'],
+                    image_options, config['save_video'], video_profile)
 
-            else:
-                #  There is no default section and no camera specific section
-                #  so we skip this camera
-                self.logger.info("  Skipped camera: " + sc.camera_name +
-                        ". No configuration entry found.")
+        #  add or update the cameras and the image and video file types in the
+        #  database. These are written in a single transaction.
+        if self.use_db:
+            self.db.update_cameras(camera_rows, image_ext=image_ext, video_ext=video_ext)
+
+        #  the worst case disk write rate caps the disk free space check interval
+        self.max_write_mb_per_s = max_write_mb_per_s
+
+        #  no triggers are pending yet
+        self.received_mask = self.all_cameras_mask
+
+        #  keep a reference to the bound emit method of our trigger signal
+        #  since it is called every trigger.
+        self.trigger_emit = self.trigger.emit
+
+        #  limit the OpenCV worker threads so image scaling and encoding doesn't
+        #  compete with the camera threads and the main thread.
+        cv2.setNumThreads(max(1, (os.cpu_count() or 4) - len(self.cameras) - 1))
 
         #  we're done with setup
         self.logger.info("Camera setup complete.")
@@ -833,7 +1247,12 @@ class AcquisitionBase(QtCore.QObject):
         self.logger.warning("WARNING: Trigger timeout. One or more cameras failed " +
                 "to respond after being triggered.")
 
-        #  and try triggering again.
+        #  write any image entries we received for the timed out trigger
+        self.WriteImageEntries()
+        self.SendServerImages()
+
+        #  stop waiting on the cameras that didn't respond and try triggering again.
+        self.received_mask = self.all_cameras_mask
         self.TriggerCameras()
 
 
@@ -852,21 +1271,50 @@ class AcquisitionBase(QtCore.QObject):
         emit the "TriggerReady" signal. You must connect these signals to a slot in
         your application that tracks the ready cameras and triggers them when all
         triggered cameras are ready.
+
+        If the cameras have not completed the previous trigger when the trigger
+        timer fires, this trigger is skipped.
         '''
 
-        #  reset the received image state for *all* cameras
-        for cam_name in self.cameras:
-            self.received[cam_name] = False
+        #  schedule the next trigger. The trigger times are kept on a fixed schedule
+        #  of trigger_period_ns so the rounding of the timer interval to whole
+        #  milliseconds doesn't accumulate. The first trigger is delayed to allow
+        #  the cameras to get ready so we start the schedule on the first trigger,
+        #  and restart it if we fall more than a period behind. Calls that are well
+        #  ahead of the schedule (from TriggerTimeout) leave the schedule alone.
+        now_ns = time.monotonic_ns()
+        late_ns = now_ns - self.next_trigger_ns
+        next_ns = None
+        if not self.next_trigger_ns or late_ns >= self.trigger_period_ns:
+            next_ns = now_ns + self.trigger_period_ns
+        elif late_ns > -self.trigger_period_ns // 2:
+            next_ns = self.next_trigger_ns + self.trigger_period_ns
+        if next_ns is not None:
+            self.next_trigger_ns = next_ns
+            interval_ms = max(0, (next_ns - now_ns + 500000) // 1000000)
+            if self.triggerTimer.interval() != interval_ms:
+                self.triggerTimer.setInterval(interval_ms)
+
+        #  skip this trigger if we're still waiting on the cameras
+        if self.received_mask != self.all_cameras_mask:
+            if self.debug_enabled:
+                self.log_debug("Cameras not ready. Skipping trigger.")
+            return
+
+        #  clear the mask of cameras that have completed this trigger
+        self.received_mask = 0
 
-        #  note the trigger time
+        #  note the trigger time. The datetime is used for file names and the database
+        #  and the monotonic clock is used to time the trigger interval.
         self.trig_time = datetime.datetime.now()
+        self.trig_time_ns = now_ns
 
         #  start the trigger timeout timer. This timer ensures that if acquisition
         #  stalls for some unhandled reason, we'll keep trying.
         self.timeoutTimer.start(self.ACQUISITION_TIMEOUT)
 
         #  emit the trigger signal to trigger the cameras
-        self.trigger.emit([], self.n_images, self.trig_time, True, True)
+        self.trigger_emit(_ALL_CAMERAS, self.n_images, self.trig_time, True, True)
 
         # TODO: Currently we only write a single entry in the sensor_data table for
         #       HDR acquisition sequences because we're not incrementing the image
@@ -876,16 +1324,18 @@ class AcquisitionBase(QtCore.QObject):
         #       be to use a decimal notation of image_number.HDR_exposure for the
         #       image numbers. For example, 143.1, 143.2, 143.3, 143.4
 
-        #  and write synced sensor data  to the db
-        for sensor_id in self.syncdSensorData:
-            for header in self.syncdSensorData[sensor_id]:
+        #  and queue the synced sensor data for the db. It is written with the image
+        #  entries when the trigger completes.
+        sync_timeout = self.sync_timeout
+        trig_time = self.trig_time
+        for sensor_id, headers in self.syncdSensorData.items():
+            for header, sensor_data in headers.items():
                 #  check if the data is fresh
-                freshness = self.trig_time - self.syncdSensorData[sensor_id][header]['time']
-                if ((self.configuration['sensors']['synchronous_timeout_secs'] < 0) or
-                    (abs(freshness.total_seconds()) <= self.configuration['sensors']['synchronous_timeout_secs'])):
-                    #  it is fresh enough. Write it to the db
-                    self.db.insert_sync_data(self.n_images, self.syncdSensorData[sensor_id][header]['time'],
-                            sensor_id, header, self.syncdSensorData[sensor_id][header]['data'])
+                rx_time, data = sensor_data
+                if sync_timeout is None or abs(trig_time - rx_time) <= sync_timeout:
+                    #  it is fresh enough
+                    self.pending_sensor_data.append((self.n_images, rx_time, sensor_id,
+                            header, data))
 
 
     @QtCore.pyqtSlot(str, str, dict)
@@ -897,30 +1347,37 @@ class AcquisitionBase(QtCore.QObject):
         has the emit_signal parameter set to True in the HDR settings.
         '''
 
+        #  keep the latest image from this camera for the server
+        if self.server is not None:
+            self.server_images[cam_name] = (cam_label, image_data)
+
         #  Check if we received an image or not
         if  not image_data['ok']:
             #  no image data
-            log_str = (cam_name + ': FAILED TO ACQUIRE IMAGE')
             if self.use_db:
-                self.db.add_dropped(self.n_images, cam_name, self.trig_time)
+                #  queue the dropped entry - it is written when the trigger completes
+                self.pending_dropped.append((self.n_images, cam_name, self.trig_time))
+            if self.debug_enabled:
+                self.log_debug('%s: FAILED TO ACQUIRE IMAGE', cam_name)
         else:
             #  we do have image data - check if we should log this image to the images table
 
             #  Only store the image file name, no path info
-            filename = Path(image_data['filename']).name
+            filename = os.path.basename(image_data['filename'])
 
             if self.use_db:
                 #  only write an entry in the images table if we have saved the
-                #  image in some way (as a still or a video frame)
+                #  image in some way (as a still or a video frame). The entry is
+                #  queued and written when the trigger completes.
                 if image_data['save_still'] or image_data['save_frame']:
-                    self.db.add_image(self.n_images, cam_name, self.trig_time, filename,
+                    self.pending_images.append((self.n_images, cam_name, self.trig_time, filename,
                             image_data['exposure'], image_data['gain'], image_data['save_still'],
-                            image_data['save_frame'])
+                            image_data['save_frame']))
 
-            log_str = (cam_name + ': Image Acquired: %dx%d  exp: %d  gain: %2.1f  filename: %s' %
-                    (image_data['width'], image_data['height'], image_data['exposure'],
-                    image_data['gain'], filename))
-        self.logger.debug(log_str)
+            if self.debug_enabled:
+                self.log_debug('%s: Image Acquired: %dx%d  exp: %d  gain: %2.1f  filename: %s',
+                        cam_name, image_data['width'], image_data['height'],
+                        image_data['exposure'], image_data['gain'], filename)
 
 
     @QtCore.pyqtSlot(object)
@@ -930,15 +1387,25 @@ class AcquisitionBase(QtCore.QObject):
         is configured to emit a signal when it does acquire an image.
         '''
 
-        #  note that this camera has completed the trigger event
-        self.received[cam_obj.camera_name] = True
+        #  note that this camera has completed the trigger event. A duplicate
+        #  response for this trigger is ignored.
+        received_mask = self.received_mask | self.camera_bits[cam_obj.camera_name]
+        if received_mask == self.received_mask:
+            return
+        self.received_mask = received_mask
 
         #  enit some debugging info
-        self.logger.debug(cam_obj.camera_name + ': Trigger Complete.')
+        if self.debug_enabled:
+            self.log_debug('%s: Trigger Complete.', cam_obj.camera_name)
 
         #  check if all triggered cameras have completed the trigger sequence
-        if (all(self.received.values())):
-            #  all cameras are done. Increment our counters
+        if self.received_mask == self.all_cameras_mask:
+            #  all cameras are done. Write this trigger's image entries to the db
+            #  and pass the images on to the server
+            self.WriteImageEntries()
+            self.SendServerImages()
+
+            #  Increment our counters
             self.n_images += 1
             self.this_images += 1
 
@@ -946,31 +1413,67 @@ class AcquisitionBase(QtCore.QObject):
             self.timeoutTimer.stop()
 
             #  check if we're configured for a limited number of triggers
-            if ((self.configuration['acquisition']['trigger_limit'] > 0) and
-                (self.this_images > self.configuration['acquisition']['trigger_limit'])):
+            if ((self.trigger_limit > 0) and (self.this_images > self.trigger_limit)):
 
-                    self.logger.info("Trigger limit of %i triggers reached. Shutting down..." %
-                            (self.this_images-1))
+                    self.logger.info("Trigger limit of %i triggers reached. Shutting down...",
+                            self.this_images - 1)
 
                     #  time to stop acquiring - call our StopAcquisition method and set
                     #  exit_app to True to exit the application after the cameras stop.
-                    self.StopAcquisition(exit_app=True,
-                            shutdown_on_exit=self.configuration['application']['shut_down_on_exit'])
-            else:
-                #  keep going - determine elapsed time and set the trigger for the next interval
-                elapsed_time_ms = (datetime.datetime.now() - self.trig_time).total_seconds() * 1000
-                acq_interval_ms = 1000.0 / self.configuration['acquisition']['trigger_rate']
-                next_int_time_ms = int(acq_interval_ms - elapsed_time_ms)
-                if next_int_time_ms < 0:
-                    next_int_time_ms = 0
+                    self.StopAcquisition(exit_app=True, shutdown_on_exit=self.shut_down_on_exit)
+            elif self.debug_enabled:
+                #  keep going - the trigger timer will fire the next trigger
+                elapsed_time_ms = (time.monotonic_ns() - self.trig_time_ns) / 1000000.
+                self.log_debug("Trigger %d completed. Last interval %8.4f ms",
+                        self.this_images, elapsed_time_ms)
 
-                self.logger.debug("Trigger %d completed. Last interval %8.4f ms" %
-                        (self.this_images, elapsed_time_ms))
 
-                #  start the next trigger timer
-                if self.isTriggering:
-                    self.logger.debug("Next trigger in  %8.4f ms." % (next_int_time_ms))
-                    self.triggerTimer.start(next_int_time_ms)
+    def ExitCleanup(self):
+        '''
+        ExitCleanup is registered with atexit and releases the database and the
+        Spinnaker system instance if the application exits without running
+        AcqisitionTeardown. It does nothing if teardown has already run.
+        '''
+
+        if self.use_db and self.db.is_open:
+            self.WriteImageEntries()
+            self.StopDbWriter()
+            self.db.close()
+
+        #  release the system instance here if teardown never got to it
+        if self.system is not None and not self._system_released:
+            self._system_released = True
+            self.system.ReleaseInstance()
+            self.system = None
+
+
+    def WriteImageEntries(self):
+        '''
+        WriteImageEntries writes the queued images, dropped, and synced sensor data
+        table entries to the database in a single transaction. Entries are queued
+        as the cameras are triggered and images are received and written when the
+        trigger completes.
+        '''
+
+        if self.pending_images or self.pending_dropped or self.pending_sensor_data:
+            if self.use_db and self.db.is_open:
+                self.dbAddImages.emit(self.pending_images, self.pending_dropped,
+                        self.pending_sensor_data)
+            self.pending_images = []
+            self.pending_dropped = []
+            self.pending_sensor_data = []
+
+
+    def SendServerImages(self):
+        '''
+        SendServerImages emits the latest image received from each camera for this
+        trigger to the server. The images are sent in a single signal so the server
+        thread receives one event per trigger instead of one per image.
+        '''
+
+        if self.server_images:
+            self.serverImageData.emit(self.server_images)
+            self.server_images = {}
 
 
     @QtCore.pyqtSlot(str, str)
@@ -980,7 +1483,7 @@ class AcquisitionBase(QtCore.QObject):
         we just log the error and move on.
         '''
         #  log it.
-        self.logger.error(cam_name + ':ERROR:' + error_str)
+        self.logger.error('%s:ERROR:%s', cam_name, error_str)
 
 
     @QtCore.pyqtSlot(str, str)
@@ -990,7 +1493,7 @@ class AcquisitionBase(QtCore.QObject):
         we just log the error and move on.
         '''
         #  log it.
-        self.logger.debug(cam_name + ':DEBUG:' + debug_str)
+        self.log_debug('%s:DEBUG:%s', cam_name, debug_str)
 
 
     @QtCore.pyqtSlot(str)
@@ -1000,7 +1503,7 @@ class AcquisitionBase(QtCore.QObject):
         For now we just log the error and move on.
         '''
         #  log it.
-        self.logger.error('CamtrawlServer:ERROR:' + error_str)
+        self.logger.error('CamtrawlServer:ERROR:%s', error_str)
 
 
     @QtCore.pyqtSlot(object, str, bool)
@@ -1010,9 +1513,9 @@ class AcquisitionBase(QtCore.QObject):
         startAcquiring signal.
         '''
         if success:
-            self.logger.info(cam_name + ': acquisition started.')
+            self.logger.info('%s: acquisition started.', cam_name)
         else:
-            self.logger.error(cam_name + ': unable to start acquisition.')
+            self.logger.error('%s: unable to start acquisition.', cam_name)
             #  NEED TO CLOSE THIS CAMERA?
 
 
@@ -1025,15 +1528,18 @@ class AcquisitionBase(QtCore.QObject):
         '''
 
         if success:
-            self.logger.info(cam_name + ': acquisition stopped.')
+            self.logger.info('%s: acquisition stopped.', cam_name)
         else:
-            self.logger.error(cam_name + ': unable to stop acquisition.')
+            self.logger.error('%s: unable to stop acquisition.', cam_name)
 
-        #  update the received dict noting this camera has stopped
-        self.received[cam_obj.camera_name] = True
+        #  note that this camera has stopped. A duplicate response is ignored.
+        stopped_mask = self.stopped_mask | self.camera_bits.get(cam_name, 0)
+        if stopped_mask == self.stopped_mask:
+            return
+        self.stopped_mask = stopped_mask
 
         #  check if all cameras have stopped
-        if (all(self.received.values())):
+        if self.stopped_mask == self.all_cameras_mask:
             self.logger.info('All cameras stopped.')
 
             #  if we're supposed to exit the application, do it
@@ -1055,13 +1561,13 @@ class AcquisitionBase(QtCore.QObject):
         #  stop the trigger and timeout timers
         self.isTriggering = False
         self.triggerTimer.stop()
+        self.next_trigger_ns = 0
         self.timeoutTimer.stop()
 
-        #  use the received dict to track the camera shutdown. When all
-        #  cameras are True, we know all of them have reported that they
-        #  have stopped recording.
-        for cam_name in self.cameras:
-            self.received[cam_name] = False
+        #  use stopped_mask to track the camera shutdown. When all of the camera
+        #  bits are set, we know all of the cameras have reported that they have
+        #  stopped recording.
+        self.stopped_mask = 0
 
         #  set the exit and shutdown states
         self.isExiting = bool(exit_app)
@@ -1097,9 +1603,11 @@ class AcquisitionBase(QtCore.QObject):
             self.serial_threads_finished = True
             
 
-        #  if we're using the database, close it
+        #  if we're using the database, write any queued entries and close it
         if self.use_db and self.db.is_open:
+            self.WriteImageEntries()
             self.logger.info("Closing the database...")
+            self.StopDbWriter()
             self.db.close()
 
         #  same with the server
@@ -1111,16 +1619,29 @@ class AcquisitionBase(QtCore.QObject):
         #  we need to make sure we release all references to our SpinCamera
         #  objects so Spinnaker can clean up behind the scenes.
         self.logger.debug("Cleaning up references to Spinnaker objects...")
-        self.received = {}
         self.hw_triggered_cameras = []
         self.cameras = {}
-        
-        #  now we'll wait a bit to allow the serial ports and server to finish closing.
+
+        #  tell the camera threads to quit, wait for them to finish, and then collect
+        #  any cycles holding Spinnaker references. The quit connected to the cameras'
+        #  acquisitionStopped signal is queued to our event loop, which is blocked
+        #  here, and it never fires if the cameras weren't acquiring. So we quit the
+        #  threads directly and bound the wait in case a camera is hung.
+        for thread in self.threads:
+            try:
+                thread.quit()
+                if not thread.wait(self.THREAD_WAIT_MS):
+                    self.logger.warning("Timed out waiting for a camera thread to finish.")
+            except RuntimeError:
+                #  the thread has already finished and been deleted
+                pass
+        self.threads = []
+        gc.collect()
+
+        #  check if the serial ports and server have finished closing once we are
+        #  back in the event loop. This also allows pending deleteLater events to run.
         self.acqisition_teardown_tries = 0
-        delayTimer = QtCore.QTimer(self)
-        delayTimer.timeout.connect(self.AcqisitionTeardownTimeout)
-        delayTimer.setSingleShot(True)
-        delayTimer.start(500)
+        QtCore.QTimer.singleShot(0, self.AcqisitionTeardownTimeout)
 
 
     @QtCore.pyqtSlot()
@@ -1140,34 +1661,32 @@ class AcquisitionBase(QtCore.QObject):
         '''
         #  keep track of how long were waiting so we can bail if
         self.acqisition_teardown_tries += 1
-        
-        #  create a timer
-        delayTimer = QtCore.QTimer(self)
-        delayTimer.setSingleShot(True)
-        
+
         #  check if we're ready to continue teardown
-        if (self.acqisition_teardown_tries >= self.TEARDOWN_TRIES or 
+        if (self.acqisition_teardown_tries >= self.TEARDOWN_TRIES or
                 self.server_finished and self.serial_threads_finished):
             #  either everything we're tracking has shut down or we're bailing
-            delayTimer.timeout.connect(self.AcqisitionTeardown2)
+            self.AcqisitionTeardown2()
         else:
-            #  we're not ready to proceed - so we'll set the timer to call 
-            delayTimer.timeout.connect(self.AcqisitionTeardownTimeout)
-
-        #  start the timer
-        delayTimer.start(500)
+            #  we're not ready to proceed - so we'll check again in a bit
+            QtCore.QTimer.singleShot(500, self.AcqisitionTeardownTimeout)
 
 
     def AcqisitionTeardown2(self):
         '''
-        AcqisitionTeardown2 is called to finish teardown. This last bit of cleanup
-        is triggered by a delay timer to give threads and the Python GC a little time
-        to finish cleaning up before we release the spinnaker instance and shut down.
+        AcqisitionTeardown2 is called to finish teardown once the serial sensor
+        and server threads have finished (or we have given up waiting on them). We
+        make sure any remaining Spinnaker references are collected before we release
+        the spinnaker instance and shut down.
         '''
 
+        #  collect any Spinnaker references released by deleteLater events
+        gc.collect()
+
         # Now we can release the Spinnaker system instance
-        if (self.system):
+        if self.system is not None and not self._system_released:
             self.logger.debug("Releasing Spinnaker system instance...")
+            self._system_released = True
             self.system.ReleaseInstance()
             self.system = None
 
@@ -1195,7 +1714,7 @@ class AcquisitionBase(QtCore.QObject):
                 #    camtrawl ALL=NOPASSWD: /sbin/shutdown.sh
                 subprocess.Popen(['sudo', '/camtrawl/software/scripts/delay_shutdown.sh'],
                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                        preexec_fn=os.setpgrp)
+                        start_new_session=True)
 
         self.logger.info("Acquisition Stopped.")
         self.logger.info("Application exiting...")
@@ -1204,6 +1723,86 @@ class AcquisitionBase(QtCore.QObject):
         QtCore.QCoreApplication.instance().quit()
 
 
+    def SetCameraParameters(self, sc, config):
+        '''SetCameraParameters sets up the triggering, exposure, gain, binning, and
+        HDR mode of the provided SpinCamera using the provided camera configuration.
+        This is called from a worker thread for each camera in ConfigureCameras so
+        the messages are returned as a list of (level, message) tuples instead of
+        being logged directly.
+        '''
+
+        camera_log = []
+
+        #  set up triggering
+        if config['trigger_source'] == 'hardware':
+            #  set up the camera to use hardware triggering
+            sc.set_camera_trigger('Hardware')
+            camera_log.append((logging.INFO, '    %s: Hardware triggering enabled.' %
+                    (sc.camera_name)))
+        else:
+            #  set up the camera for software triggering
+            sc.set_camera_trigger('Software')
+            camera_log.append((logging.INFO, '    %s: Software triggering enabled.' %
+                    (sc.camera_name)))
+
+        # This should probably be set on the camera to ensure the line is inverted
+        # when the camera starts up.
+        #ok = sc.set_strobe_trigger(1)
+
+        #  set the camera exposure, gain, and rotation
+        sc.set_exposure(config['exposure_us'])
+        sc.set_gain(config['gain'])
+        sc.rotation = config['rotation']
+        camera_log.append((logging.INFO, '    %s: label: %s  gain: %d  exposure_us: %d  rotation:%s' %
+                (sc.camera_name, config['label'], sc.get_gain(), sc.get_exposure(),
+                config['rotation'])))
+
+        #  set the sensor binning
+        sc.set_binning(config['sensor_binning'])
+        binning = sc.get_binning()
+        camera_log.append((logging.INFO, '    %s: Sensor binning set to %i x %i' %
+                (sc.camera_name, binning, binning)))
+
+        #  set up HDR if configured
+        if config['hdr_enabled']:
+            ok = sc.enable_hdr_mode()
+            if ok:
+                camera_log.append((logging.INFO, '    %s: Enabling HDR: OK' % (sc.camera_name)))
+                if config['hdr_settings'] is not None:
+                    camera_log.append((logging.INFO, '    %s: Setting HDR Params: %s' %
+                            (sc.camera_name, config['hdr_settings'])))
+                    sc.set_hdr_settings(config['hdr_settings'])
+                else:
+                    camera_log.append((logging.INFO, '    %s: HDR Params not provided. ' %
+                            (sc.camera_name) + 'Using values from camera.'))
+
+                sc.hdr_save_merged = config['hdr_save_merged']
+                sc.hdr_signal_merged = config['hdr_signal_merged']
+                sc.hdr_merge_method = config['hdr_merge_method']
+                sc.hdr_tonemap_saturation = config['hdr_tonemap_saturation']
+                sc.hdr_tonemap_bias = config['hdr_tonemap_bias']
+                sc.hdr_tonemap_gamma = config['hdr_tonemap_gamma']
+
+                #  check if there is a camera response file to load
+                response_file = config['hdr_response_file']
+                if response_file in ['none', 'None', 'NONE']:
+                    response_file = None
+                if response_file is not None:
+                    try:
+                        sc.load_hdr_response(response_file)
+                        camera_log.append((logging.INFO, '    %s: Loaded HDR response file: %s' %
+                                (sc.camera_name, response_file)))
+                    except (NotImplementedError, OSError, ValueError):
+                        camera_log.append((logging.ERROR, '    %s: Failed to load HDR response file: %s' %
+                                (sc.camera_name, response_file)))
+            else:
+                camera_log.append((logging.ERROR, '    %s: Failed to enable HDR.' % (sc.camera_name)))
+        else:
+            sc.disable_hdr_mode()
+
+        return camera_log
+
+
     def GetCameraConfiguration(self, camera_name):
         '''GetCameraConfiguration returns a bool specifying if the camera should
         be utilized and a dict containing any camera configuration parameters. It
@@ -1213,26 +1812,39 @@ class AcquisitionBase(QtCore.QObject):
         It first looks for camera specific entries, if that isn't found it checks
         for a 'default' entry. If a camera specific entry doesn't exist and there
         is no 'default' section, the camera is not used by the application.
-        '''
 
-        add_camera = False
+        The configurations are cached by section so all cameras using the 'default'
+        section share the same configuration dict. Don't modify the returned dict.
+        '''
 
-        #  start with the default camera configuration
-        config = AcquisitionBase.CAMERA_CONFIG_OPTIONS.copy()
+        #  check if we have already built the configuration for this camera's section.
+        #  Camera specific sections take precedence over the 'default' section.
+        cams_cfg = self.configuration['cameras']
+        if camera_name in cams_cfg:
+            section = camera_name
+        else:
+            section = 'default'
+        cached = self.camera_configs.get(section)
+        if cached is not None:
+            return cached
+
+        #  we add cameras that are explicitly configured in the config file and
+        #  all cameras if there is a 'default' section in the config file
+        add_camera = section in cams_cfg
+
+        #  start with the default camera configuration and update it with the
+        #  section's settings. None of the default values are mappings so a
+        #  single level merge gives the same result as a nested update.
+        if add_camera:
+            config = {**AcquisitionBase.CAMERA_CONFIG_OPTIONS, **(cams_cfg[section] or {})}
+        else:
+            config = dict(AcquisitionBase.CAMERA_CONFIG_OPTIONS)
 
-        # Look for a camera specific entry first
-        if camera_name in self.configuration['cameras']:
-            #  update this camera's config with the camera specific settings
-            config = self.__update(config, self.configuration['cameras'][camera_name])
-            #  we add cameras that are explicitly configured in the config file
-            add_camera = True
+        #  normalize the case of options that are compared against keywords
+        for option in _LOWERCASE_CAMERA_OPTIONS:
+            config[option] = config[option].lower()
 
-        # If that fails, check for a default section
-        elif 'default' in self.configuration['cameras']:
-            #  update this camera's config with the camera specific settings
-            config = self.__update(config, self.configuration['cameras']['default'])
-            #  we add all cameras if there is a 'default' section in the config file
-            add_camera = True
+        self.camera_configs[section] = (add_camera, config)
 
         return add_camera, config
 
@@ -1244,9 +1856,9 @@ class AcquisitionBase(QtCore.QObject):
         for remote viewing and control of the system.
         '''
 
-        self.logger.info("Opening Camtrawl server on  " +
-                self.configuration['server']['server_interface'] + ":" +
-                str(self.configuration['server']['server_port']))
+        self.logger.info("Opening Camtrawl server on  %s:%s",
+                self.configuration['server']['server_interface'],
+                self.configuration['server']['server_port'])
 
         #  create a dict to pass to the server keyed by camera name that
         #  contains a dicts with a 'label' key which is used by the server
@@ -1259,7 +1871,9 @@ class AcquisitionBase(QtCore.QObject):
         for cam in self.cameras.keys():
             server_cam_dict[cam] = {'label':self.cameras[cam].label}
 
-        #  create an instance of CamtrawlServer
+        #  create an instance of CamtrawlServer. The server is imported here so
+        #  QtNetwork and the protobuf messages aren't loaded when it isn't used.
+        from CamtrawlServer import CamtrawlServer
         self.server = CamtrawlServer.CamtrawlServer(
                 self.configuration['server']['server_interface'],
                 self.configuration['server']['server_port'],
@@ -1267,19 +1881,22 @@ class AcquisitionBase(QtCore.QObject):
 
         #  connect the server's signals and slots
         self.server.sensorData.connect(self.SensorDataAvailable)
-        self.sensorData.connect(self.server.sensorDataAvailable)
+        self.sensorData.connect(self.server.sensorDataAvailable, QtCore.Qt.QueuedConnection)
         self.server.getParameterRequest.connect(self.GetParameterRequest)
         self.server.setParameterRequest.connect(self.SetParameterRequest)
         self.server.error.connect(self.LogServerError)
         self.server.serverClosed.connect(self.ServerStopped)
-        self.stopServer.connect(self.server.stopServer)
+        self.stopServer.connect(self.server.stopServer, QtCore.Qt.QueuedConnection)
 
-        #  connect our signals to the server
-        self.parameterChanged.connect(self.server.parameterDataAvailable)
+        #  connect our signals to the server. The server runs in its own thread
+        #  so these are explicitly queued.
+        self.parameterChanged.connect(self.server.parameterDataAvailable,
+                QtCore.Qt.QueuedConnection)
 
-        #  connect our cameras imageData signals to the server
-        for cam_name in self.cameras:
-            self.cameras[cam_name].imageData.connect(self.server.newImageAvailable)
+        #  connect our image data signal to the server. The images from each
+        #  trigger are forwarded by SendServerImages.
+        self.serverImageData.connect(self.server.newImagesAvailable,
+                QtCore.Qt.QueuedConnection)
 
         #  create a thread to run CamtrawlServer
         self.serverThread = QtCore.QThread(self)
@@ -1298,6 +1915,53 @@ class AcquisitionBase(QtCore.QObject):
         self.serverThread.start()
 
 
+    def StartDbWriter(self):
+        '''StartDbWriter creates the metadata_writer and starts its thread. The
+        image, dropped, and sensor data entries are written by the writer so the
+        database IO doesn't hold up triggering and the camera signals. Setup
+        still uses the metadata_db instance directly.
+        '''
+
+        self.db_writer = metadata_writer(self.db.db_file)
+
+        #  connect our signals to the writer
+        self.dbAddImages.connect(self.db_writer.add_images, QtCore.Qt.QueuedConnection)
+        self.dbAddAsyncData.connect(self.db_writer.insert_async_data,
+                QtCore.Qt.QueuedConnection)
+
+        #  closing blocks until the writer has written all queued entries
+        self.dbCloseWriter.connect(self.db_writer.close, QtCore.Qt.BlockingQueuedConnection)
+
+        #  create a thread to run the writer and move the writer to it
+        self.dbThread = QtCore.QThread(self)
+        self.db_writer.moveToThread(self.dbThread)
+
+        #  the writer opens its database connection when the thread starts
+        self.dbThread.started.connect(self.db_writer.start_writer)
+        self.dbThread.finished.connect(self.db_writer.deleteLater)
+
+        self.dbThread.start()
+
+
+    def StopDbWriter(self):
+        '''StopDbWriter waits for the metadata_writer to write any queued entries,
+        closes it, and stops its thread.
+        '''
+
+        if self.db_writer is None:
+            return
+
+        try:
+            if self.dbThread.isRunning():
+                self.dbCloseWriter.emit()
+                self.dbThread.quit()
+                self.dbThread.wait()
+        except RuntimeError:
+            #  the thread has already been deleted
+            pass
+        self.db_writer = None
+
+
     def OpenDatabase(self):
         '''OpenDatabase opens the acquisition database file. This method creates a new
         db file or opens an existing file depending on the mode of operation. It also
@@ -1310,77 +1974,71 @@ class AcquisitionBase(QtCore.QObject):
         '''
 
         # Open the database file
-        dbFile = self.log_dir + os.sep + self.configuration['application']['database_name']
-        self.logger.info("Opening database file: " + dbFile)
-
-        if not self.db.open(dbFile):
-            # If we're running in combined mode and we can't open the db file it is
-            # possible that the file is corrupted. When this happens we don't want to
-            # fail to acquire so we're going to try to open a new file. We'll just append
-            # a number to the original file name so we can easily know the name. On subsequent
-            # cycles the original db file will still be corrupt, but this code should
-            # either create or open the next non-corrupt file.
-            if self.configuration['application']['output_mode'].lower() == 'combined':
-                self.logger.error('Error opening SQLite database file ' + dbFile +
-                        '. Attempting to open an alternate...')
-
-                #  to make the naming predictable we just append a number to it. MAX_DB_ALTERNATES
-                #  sets an upper bound on this process so we don't stall here forever.
-                for n_try in range(self.MAX_DB_ALTERNATES):
-
-                    #  create the new filename
-                    filename, file_ext = os.path.splitext(dbFile)
-                    dbFile = filename + '-' + str(n_try) + file_ext
-
-                    #  try to open it
-                    self.logger.info("  Opening database file: " + dbFile)
-                    if not self.db.open(dbFile):
-                        self.logger.error('  Error opening alternate database file ' + dbFile +'.')
-                    else:
-                        # success!
-                        break
-
-                if not self.db.is_open:
-                    #  we failed :(
-                    self.logger.error('  Failed to open an alternate database file.')
-                    self.logger.error('  Acquisition will continue without the database but ' +
-                            'this situation is not ideal.')
-                    self.logger.error('  Will use max(file image number) + 1 to determine ' +
-                            'current image number.')
-                    self.use_db = False
+        dbFile = os.path.join(self.log_dir, self.configuration['application']['database_name'])
+        self.logger.info("Opening database file: %s", dbFile)
 
-            else:
-                # When we're not running in combined mode, we will always be creating
-                # a new db file. If we cannot open a *new* file, we'll assume the
-                # file system is not writable and we'll exit the application.
-                self.logger.error('Error opening SQLite database file ' + dbFile +'.')
+        if self.db.open(dbFile):
+            #  the database is open - get the starting image number from it and we're done
+            self.n_images = self.db.get_next_image_number()
+            return
+
+        # If we're running in combined mode and we can't open the db file it is
+        # possible that the file is corrupted. When this happens we don't want to
+        # fail to acquire so we're going to try to open a new file. We'll just append
+        # a number to the original file name so we can easily know the name. On subsequent
+        # cycles the original db file will still be corrupt, but this code should
+        # either create or open the next non-corrupt file.
+        if self.configuration['application']['output_mode'] == 'combined':
+            self.logger.error('Error opening SQLite database file %s. ' +
+                    'Attempting to open an alternate...', dbFile)
+
+            #  to make the naming predictable we just append a number to it. MAX_DB_ALTERNATES
+            #  sets an upper bound on this process so we don't stall here forever.
+            filename, file_ext = os.path.splitext(dbFile)
+            for n_try in range(self.MAX_DB_ALTERNATES):
+
+                #  create the new filename from the original name
+                dbFile = filename + '-' + str(n_try) + file_ext
+
+                #  try to open it
+                self.logger.info("  Opening database file: %s", dbFile)
+                if not self.db.open(dbFile):
+                    self.logger.error('  Error opening alternate database file %s.', dbFile)
+                else:
+                    # success!
+                    break
+
+            if not self.db.is_open:
+                #  we failed :(
+                self.logger.error('  Failed to open an alternate database file.')
                 self.logger.error('  Acquisition will continue without the database but ' +
-                            'this situation is not ideal.')
+                        'this situation is not ideal.')
+                self.logger.error('  Will use max(file image number) + 1 to determine ' +
+                        'current image number.')
                 self.use_db = False
 
+        else:
+            # When we're not running in combined mode, we will always be creating
+            # a new db file. If we cannot open a *new* file, we'll assume the
+            # file system is not writable and we'll exit the application.
+            self.logger.error('Error opening SQLite database file %s.', dbFile)
+            self.logger.error('  Acquisition will continue without the database but ' +
+                        'this situation is not ideal.')
+            self.use_db = False
+
         #  determine the starting image number - if we can't get the number from the
         #  metadata database, we'll pick through the data files.
         if self.use_db:
+            #  we opened an alternate database file
             self.n_images = self.db.get_next_image_number()
-        else:
+        elif self.configuration['application']['output_mode'] == 'combined':
             #  don't have the db, pick through the files for the next image number.
             #  This is a failsafe for combined mode that allows us to keep acquiring
             #  images even if the metadata database gets corrupted.
-            max_num = -1
-            cam_dirs = os.listdir(self.image_dir)
-            for cam_dir in cam_dirs:
-                img_files = os.listdir(self.image_dir + os.sep + cam_dir)
-                for file in img_files:
-                    try:
-                        img_num = int(file.split('_')[0])
-                        if (img_num > max_num):
-                            max_num = img_num
-                    except:
-                        pass
-            if max_num < 0:
-                self.n_images = 1
-            else:
-                self.n_images = max_num + 1
+            self.n_images = _max_image_number(self.image_dir) + 1
+        else:
+            #  a new deployment directory has no images so we start at 1
+            self.n_images = 1
 
 
     @QtCore.pyqtSlot(str, str, object)
@@ -1396,17 +2054,15 @@ class AcquisitionBase(QtCore.QObject):
             #  get the time
             rx_time = datetime.datetime.now()
             
-            #  check if we're prepending a header
-            if sensor_id in self.configuration['sensors']['installed_sensors']:
-                #  check if we're adding a header to this data
-                if 'add_header' in self.configuration['sensors']['installed_sensors'][sensor_id]:
-                    #  yes, add the header to the data string
-                    header = self.configuration['sensors']['installed_sensors'][sensor_id]['add_header']
-                    data = header + ',' + data
-                else:
-                    #  no, we're not adding one. Parse it from the data string
-                    data_bits = data.split(',')
-                    header = data_bits[0]
+            #  check if we're prepending a header to this data
+            sensor_cfg = self.installed_sensors.get(sensor_id)
+            if sensor_cfg is not None and 'add_header' in sensor_cfg:
+                #  yes, add the header to the data string
+                header = sensor_cfg['add_header']
+                data = header + ',' + data
+            else:
+                #  no, we're not adding one. Parse it from the data string
+                header = data.partition(',')[0]
     
             #  and call SensorDataAvailable
             self.SensorDataAvailable(sensor_id, header, rx_time, data)
@@ -1425,7 +2081,7 @@ class AcquisitionBase(QtCore.QObject):
     def SerialDeviceError(self, device, err):
         '''The SerialDeviceError slot is called when a sensor serial device emits an error
         '''
-        self.logger.error("ERROR: serial device '" + device + "': " + str(err))
+        self.logger.error("ERROR: serial device '%s': %s", device, err)
         
 
     @QtCore.pyqtSlot(str, str)
@@ -1436,7 +2092,7 @@ class AcquisitionBase(QtCore.QObject):
         this method.
         '''
 
-        cam_names = list(self.received.keys())
+        cam_names = list(self.cameras.keys())
 
         #  split the parameter path
         params = parameter.split('/')
@@ -1493,7 +2149,7 @@ class AcquisitionBase(QtCore.QObject):
         '''
 
         #  get a list of our current cameras
-        cam_names = list(self.received.keys())
+        cam_names = list(self.cameras.keys())
 
         #  split the parameter path
         params = parameter.split('/')
@@ -1513,6 +2169,8 @@ class AcquisitionBase(QtCore.QObject):
             elif params[0].lower() == 'stop_triggering':
                 if self.isTriggering:
                     self.isTriggering = False
+                    self.triggerTimer.stop()
+                    self.next_trigger_ns = 0
                 self.parameterChanged.emit(module, 'is_triggering', str(int(self.isTriggering)), 1, '')
 
             #  check if this is a camera specific parameter
@@ -1529,7 +2187,7 @@ class AcquisitionBase(QtCore.QObject):
                         if ok:
                             param_value = self.cameras[params[0]].get_gain()
                             self.parameterChanged.emit(module, parameter, str(param_value), 1, '')
-                    except:
+                    except (ValueError, PySpin.SpinnakerException):
                         pass
 
                 elif params[1].lower() == 'exposure':
@@ -1539,7 +2197,7 @@ class AcquisitionBase(QtCore.QObject):
                         if ok:
                             param_value = self.cameras[params[0]].get_exposure()
                             self.parameterChanged.emit(module, parameter, str(param_value), 1, '')
-                    except:
+                    except (ValueError, PySpin.SpinnakerException):
                         pass
         
         #  Users can send data to attached sensors to configure or control them.
@@ -1553,6 +2211,16 @@ class AcquisitionBase(QtCore.QObject):
                 self.serialSensors.txData(params[0], value)
             
 
+    def UpdateSensorHeaders(self):
+        '''UpdateSensorHeaders builds the sets of synced and async sensor data headers
+        from the sensors configuration. It must be called after headers are added to
+        the synchronous or asynchronous lists.
+        '''
+
+        self.sync_headers = frozenset(self.configuration['sensors']['synchronous'])
+        self.async_headers = frozenset(self.configuration['sensors']['asynchronous'])
+
+
     @QtCore.pyqtSlot(str, str, datetime.datetime, str)
     def SensorDataAvailable(self, sensor_id, header, rx_time, data):
         '''
@@ -1581,25 +2249,34 @@ class AcquisitionBase(QtCore.QObject):
         '''
 
         #  check if we should log this data
-        if sensor_id in self.configuration['sensors']['installed_sensors']:
+        sensor_cfg = self.installed_sensors.get(sensor_id)
+        if sensor_cfg is not None:
 
             #  determine if this data is synced or async
-            is_synchronous = self.default_is_synchronous
-            if header in self.configuration['sensors']['synchronous']:
+            if header in self.sync_headers:
                 is_synchronous = True
-            elif header in self.configuration['sensors']['asynchronous']:
+            elif header in self.async_headers:
                 is_synchronous = False
+            else:
+                is_synchronous = self.default_is_synchronous
 
             if is_synchronous:
                 #  this data should be cached to be written to the db when the cameras are triggered
 
                 #  first check if we have an entry for this sensor
-                if sensor_id not in self.syncdSensorData:
+                headers = self.syncdSensorData.get(sensor_id)
+                if headers is None:
                     #  nope, add it
-                    self.syncdSensorData[sensor_id] = {}
+                    headers = self.syncdSensorData[sensor_id] = {}
 
-                #  add the data
-                self.syncdSensorData[sensor_id][header] = {'time':rx_time, 'data':data}
+                #  add the data. Entries are [rx_time, data] lists that are updated
+                #  in place so we aren't creating a new object for every datagram.
+                entry = headers.get(header)
+                if entry is None:
+                    headers[header] = [rx_time, data]
+                else:
+                    entry[0] = rx_time
+                    entry[1] = data
 
             else:
                 #  this is async sensor data so we (possibly) just write it
@@ -1609,23 +2286,22 @@ class AcquisitionBase(QtCore.QObject):
                     write_async = True
                     
                     #  check if we're logging this data on an interval
-                    if self.configuration['sensors']['installed_sensors'][sensor_id]['logging_interval_ms']:
+                    if sensor_cfg['logging_interval_ms']:
                         #  logging_interval_ms is not none, so yes. Check when we last wrote this data
-                        if self.configuration['sensors']['installed_sensors'][sensor_id]['last_write']:
+                        if sensor_cfg['last_write']:
                             #  we have a last_write time - check the interval to see if we need to write this data
-                            time_diff = rx_time - self.configuration['sensors']['installed_sensors'][sensor_id]['last_write']
-                            if ((time_diff.seconds * 1000) >= 
-                                    self.configuration['sensors']['installed_sensors'][sensor_id]['logging_interval_ms']):
-                                self.configuration['sensors']['installed_sensors'][sensor_id]['last_write'] = rx_time
+                            time_diff = rx_time - sensor_cfg['last_write']
+                            if (time_diff.total_seconds() * 1000) >= sensor_cfg['logging_interval_ms']:
+                                sensor_cfg['last_write'] = rx_time
                             else:
                                 #  we don't need to log this data
                                 write_async = False
                         else:
                             #  this is the first time we're logging this sensor's data
-                            self.configuration['sensors']['installed_sensors'][sensor_id]['last_write'] = rx_time
+                            sensor_cfg['last_write'] = rx_time
                     
                     if write_async:
-                        self.db.insert_async_data(sensor_id, header, rx_time, data)
+                        self.dbAddAsyncData.emit(sensor_id, header, rx_time, data)
 
         #  lastly emit the sensorData signal to send it to the server 
         self.sensorData.emit(sensor_id, header, rx_time, data)
@@ -1636,34 +2312,16 @@ class AcquisitionBase(QtCore.QObject):
         configuration dictionary.
         '''
 
-        #  read the configuration file
-        with open(config_file, 'r') as cf_file:
-            try:
-                config = yaml.safe_load(cf_file)
-            except yaml.YAMLError as exc:
-                self.logger.error('Error reading configuration file ' + self.config_file)
-                self.logger.error('  Error string:' + str(exc))
-                self.logger.error('  We will try to proceed, but things are probably not going to ' +
-                        'work like you want them too.')
+        #  read the configuration file - parsed files are cached by _load_yaml_cached
+        try:
+            config = _load_yaml_cached(config_file)
+        except yaml.YAMLError as exc:
+            self.logger.error('Error reading configuration file %s', config_file)
+            self.logger.error('  Error string: %s', exc)
+            self.logger.error('  We will try to proceed, but things are probably not going to ' +
+                    'work like you want them too.')
+            #  proceed with the defaults
+            config = None
 
         # Update/extend the configuration values and return
-        return self.__update(config_dict, config)
-
-
-    def __update(self, d, u):
-            """
-            Update a nested dictionary or similar mapping.
-
-            Source: https://stackoverflow.com/questions/3232943/update-value-of-a-nested-dictionary-of-varying-depth
-            Credit: Alex Martelli / Alex Telon
-            """
-            for k, v in u.items():
-                if isinstance(v, collections.abc.Mapping):
-                    #  if a value is None, just assign the value, otherwise keep going
-                    if d.get(k, {}) is None:
-                        d[k] = v
-                    else:
-                        d[k] = self.__update(d.get(k, {}), v)
-                else:
-                    d[k] = v
-            return d
+        return _update_mapping(config_dict, config)
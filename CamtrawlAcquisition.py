@@ -42,6 +42,29 @@ from PyQt5 import QtCore
 import CamtrawlController
 
 
+#  the Camtrawl controller states that start triggering and the message logged for each
+_TRIGGER_STATE_MESSAGES = {
+        CamtrawlController.CamtrawlController.FORCED_ON:
+            "System operating in forced trigger mode - starting triggering...",
+        CamtrawlController.CamtrawlController.AT_DEPTH:
+            "System operating in deployed mode (@depth) - starting triggering...",
+        CamtrawlController.CamtrawlController.PRESSURE_SW_CLOSED:
+            "System operating in deployed mode (p-switch) - starting triggering..."}
+
+#  the reasons logged for the Camtrawl controller shutdown states
+_SHUTDOWN_STATE_MESSAGES = {
+        CamtrawlController.CamtrawlController.FORCE_ON_REMOVED:
+            "The system is shutting down because the force on plug has been pulled.",
+        CamtrawlController.CamtrawlController.SHALLOW:
+            "The system is shutting down because the system has reached the turn-off depth.",
+        CamtrawlController.CamtrawlController.PRESSURE_SW_OPENED:
+            "The system is shutting down because the pressure switch has opened.",
+        CamtrawlController.CamtrawlController.LOW_BATT:
+            "The system is shutting down due to low battery.",
+        CamtrawlController.CamtrawlController.PC_ERROR:
+            "The system is shutting down due to an acquisition software error."}
+
+
 class CamtrawlAcquisition(AcquisitionBase):
     """
     CamtrawlAcquisition.py is the image acquisition application for the
@@ -63,10 +86,11 @@ class CamtrawlAcquisition(AcquisitionBase):
         # Define additional default properties
         self.controller = None
         self.controllerStarting = False
-        self.HWTriggerHDR = {}
         self.controller_port = {}
         self.controllerCurrentState = 0
-        self.readyToTrigger = {}
+        self.hw_triggered_mask = 0
+        self.hw_ready_mask = 0
+        self.hw_hdr_mask = 0
 
         #  Add default config values for the controller. We add the controller to the
         #  sensors section in AcquisitionSetup2 to ensure that it is ignored during sensor
@@ -112,6 +136,7 @@ class CamtrawlAcquisition(AcquisitionBase):
                 #  in AcquisitionBase.AcquisitionSetup.
                 self.configuration['sensors']['synchronous'].extend(['$OHPR'])
                 self.configuration['sensors']['asynchronous'].extend(['$CTCS', '$SBCS', '$IMUC', '$CTSV'])
+                self.UpdateSensorHeaders()
                 self.configuration['sensors']['installed_sensors']['CTControl'] = {}
                 self.configuration['sensors']['installed_sensors']['CTControl']['logging_interval_ms'] = None
                 
@@ -161,9 +186,9 @@ class CamtrawlAcquisition(AcquisitionBase):
         board which provides power control, sensor integration, and camera and
         strobe triggering for the Camtrawl camera platform.
         '''
-        self.logger.info("Connecting to Camtrawl controller on port: " +
-                self.configuration['controller']['serial_port'] + " baud: " +
-                str(self.configuration['controller']['baud_rate']))
+        self.logger.info("Connecting to Camtrawl controller on port: %s baud: %s",
+                self.configuration['controller']['serial_port'],
+                self.configuration['controller']['baud_rate'])
 
         #  create an instance of CamtrawlController
         self.controller = CamtrawlController.CamtrawlController(serial_port=
@@ -200,10 +225,10 @@ class CamtrawlAcquisition(AcquisitionBase):
                     self.logger.info("    Type: PA4-LD")
                 else:
                     self.logger.info("    Type: Analog")
-                self.logger.info("    Depth conversion slope: %8.4f" % (data['slope']))
-                self.logger.info("    Depth conversion offset: %8.4f" % (data['intercept']))
-                self.logger.info("    System turn-on depth: %d" % (data['turn_on_depth']))
-                self.logger.info("    System turn-off depth: %d" % (data['turn_off_depth']))
+                self.logger.info("    Depth conversion slope: %8.4f", data['slope'])
+                self.logger.info("    Depth conversion offset: %8.4f", data['intercept'])
+                self.logger.info("    System turn-on depth: %d", data['turn_on_depth'])
+                self.logger.info("    System turn-off depth: %d", data['turn_off_depth'])
             else:
                 self.logger.info("Pressure sensor is not installed.")
 
@@ -211,14 +236,14 @@ class CamtrawlAcquisition(AcquisitionBase):
 
             if data['enabled'] > 0:
                 self.logger.info("System voltage monitoring enabled.")
-                self.logger.info("    Startup voltage threshold: %8.4f" % (data['startup_threshold']))
+                self.logger.info("    Startup voltage threshold: %8.4f", data['startup_threshold'])
             else:
                 self.logger.info("System voltage monitoring disabled.")
 
         elif header == 'getShutdownVoltage':
 
             if data['enabled'] > 0:
-                self.logger.info("    Shutdown voltage threshold: %8.4f" % (data['shutdown_threshold']))
+                self.logger.info("    Shutdown voltage threshold: %8.4f", data['shutdown_threshold'])
 
 
     @QtCore.pyqtSlot(int)
@@ -302,70 +327,45 @@ class CamtrawlAcquisition(AcquisitionBase):
             #  If the state hasn't changed we just return. This wouldn't normally happen
             return
 
-        self.logger.info("Camtrawl controller state changed. New state is " +
-                str(new_state))
+        self.logger.info("Camtrawl controller state changed. New state is %s",
+                new_state)
 
-        if ((new_state == self.controller.FORCED_ON) and not
-                self.configuration['application']['always_trigger_at_start']):
+        controller = self.controller
+        always_trigger = self.configuration['application']['always_trigger_at_start']
+
+        if (new_state == controller.FORCED_ON) and not always_trigger:
             #  the system has been forced on and we're not being forced to start
             #  so we *do not* start triggering.
 
             self.logger.info("System operating in download mode.")
 
-        elif ((new_state == self.controller.FORCED_ON) and
-                self.configuration['application']['always_trigger_at_start']):
-            #  the system has been forced on and we're configured to always
-            #  trigger when starting so we start the trigger timer.
+        elif new_state in _TRIGGER_STATE_MESSAGES:
+            #  the system is deployed at depth (pressure sensor or pressure switch) or
+            #  it has been forced on and we're configured to always trigger when starting
+            #  so we start the trigger timer.
 
-            self.logger.info("System operating in forced trigger mode - starting triggering...")
+            self.logger.info(_TRIGGER_STATE_MESSAGES[new_state])
             self.internalTriggering = True
             self.isTriggering = True
             #  The first trigger interval is long to ensure the cameras are ready
             self.triggerTimer.start(500)
 
-        elif new_state == self.controller.AT_DEPTH:
-            #  the pressure sensor reports a depth >= the controller turn on depth
-            #  We assume we're deployed at depth
-
-            self.logger.info("System operating in deployed mode (@depth) - starting triggering...")
-            self.internalTriggering = True
-            self.isTriggering = True
-            #  The first trigger interval is long to ensure the cameras are ready
-            self.triggerTimer.start(500)
-
-        elif new_state == self.controller.PRESSURE_SW_CLOSED:
-            #  the "pressure switch" has closed - we assume we're deployed at depth
-
-            self.logger.info("System operating in deployed mode (p-switch) - starting triggering...")
-            self.internalTriggering = True
-            self.isTriggering = True
-            #  The first trigger interval is long to ensure the cameras are ready
-            self.triggerTimer.start(500)
-
-        elif new_state >= self.controller.FORCE_ON_REMOVED:
+        elif new_state >= controller.FORCE_ON_REMOVED:
             #  The controller is in one of many shutdown states
 
             #  Stop the shutdownTimer in the rare case it is running and the system
             #  entered into a new shutdown state.
             self.shutdownTimer.stop()
 
-            #  branch on the type to report why we're shutting down then shut down.
-            if new_state == self.controller.FORCE_ON_REMOVED:
-                self.logger.info("The system is shutting down because the force on plug has been pulled.")
-            elif new_state == self.controller.SHALLOW:
-                self.logger.info("The system is shutting down because the system has reached the turn-off depth.")
-            elif new_state == self.controller.PRESSURE_SW_OPENED:
-                self.logger.info("The system is shutting down because the pressure switch has opened.")
-            elif new_state == self.controller.LOW_BATT:
-                self.logger.info("The system is shutting down due to low battery.")
-            elif new_state == self.controller.PC_ERROR:
-                self.logger.info("The system is shutting down due to an acquisition software error.")
+            #  report why we're shutting down then shut down.
+            if new_state in _SHUTDOWN_STATE_MESSAGES:
+                self.logger.info(_SHUTDOWN_STATE_MESSAGES[new_state])
 
             #  The controller is telling us to shut down.
             self.logger.info("Initiating a normal shutdown...")
 
             #  ACK the controller so it knows we're shutting down
-            self.controller.sendShutdownAckSignal()
+            controller.sendShutdownAckSignal()
 
             #  start the shutdown process by calling StopAcquisition. We set the
             #  exit_app keyword to True to exit the app after the cameras have
@@ -413,8 +413,9 @@ class CamtrawlAcquisition(AcquisitionBase):
 
             #  Log that we're stopping because we're out of disk space
             self.logger.critical("The system is stopping because the data disk is full.")
-            self.logger.critical("  Free space: %d MB is less than the " % (disk_free_mb) +
-                    "minimum allowed %d MB" % (self.configuration['application']['disk_free_min_mb']))
+            self.logger.critical("  Free space: %d MB is less than the " +
+                    "minimum allowed %d MB", disk_free_mb,
+                    self.configuration['application']['disk_free_min_mb'])
 
             #  if we're using the controller, we don't stop, but signal the controller
             #  we want to stop.
@@ -428,6 +429,9 @@ class CamtrawlAcquisition(AcquisitionBase):
                 #  Stop acquisition and close the app
                 self.StopAcquisition(exit_app=True,
                         shutdown_on_exit=self.configuration['application']['shut_down_on_exit'])
+        else:
+            #  schedule the next check
+            self.diskStatTimer.start(self.NextDiskCheckInterval(disk_free_mb))
 
 
     @QtCore.pyqtSlot(str, str)
@@ -438,17 +442,17 @@ class CamtrawlAcquisition(AcquisitionBase):
             #  issue is related to opening the serial port and we will assume we
             #  will not be able to use the controller. If we're told to use the
             #  controller and we can't we consider this a fatal error and bail.
-            self.logger.critical("Unable to connect to the Camtrawl controller @ port: "+
-                self.configuration['controller']['serial_port'] + " baud: " +
-                str(self.configuration['controller']['baud_rate']))
-            self.logger.critical("    ERROR: " + error)
+            self.logger.critical("Unable to connect to the Camtrawl controller @ port: %s baud: %s",
+                self.configuration['controller']['serial_port'],
+                self.configuration['controller']['baud_rate'])
+            self.logger.critical("    ERROR: %s", error)
             #TODO: Need to clean up this exit path - there is still a thread
             #      running when we exit here
             self.StopAcquisition(exit_app=True)
             return
 
         #  log the serial error. Normally this will never get called.
-        self.logger.error("Camtrawl Controller Serial error: " + error)
+        self.logger.error("Camtrawl Controller Serial error: %s", error)
 
 
     def ConfigureCameras(self):
@@ -462,6 +466,7 @@ class CamtrawlAcquisition(AcquisitionBase):
 
         #  initialize some properties specific to CamtrawlAcquisition
         self.controller_port = {}
+        self.hw_triggered_mask = 0
 
         # now we work through our configured cameras and set up some Camtrawl
         # controller specific bits.
@@ -487,6 +492,10 @@ class CamtrawlAcquisition(AcquisitionBase):
                 if sc in self.hw_triggered_cameras:
                     sc.triggerReady.connect(self.HWTriggerReady)
 
+                    #  set this camera's bit in the mask used to track the ready state
+                    #  of the hardware triggered cameras
+                    self.hw_triggered_mask |= self.camera_bits[sc.camera_name]
+
         return ok
 
 
@@ -513,8 +522,6 @@ class CamtrawlAcquisition(AcquisitionBase):
             super().AcqisitionTeardown()
 
             #  clean up some CamtrawlAcquisition specific objects
-            self.readyToTrigger = {}
-            self.HWTriggerHDR = {}
             self.controller_port = {}
 
 
@@ -531,8 +538,6 @@ class CamtrawlAcquisition(AcquisitionBase):
         super().AcqisitionTeardown()
 
         #  clean up some CamtrawlAcquisition specific objects
-        self.readyToTrigger = {}
-        self.HWTriggerHDR = {}
         self.controller_port = {}
 
 
@@ -594,15 +599,20 @@ class CamtrawlAcquisition(AcquisitionBase):
         trigger method.
         '''
 
+        #  the base class skips the trigger if we're still waiting on the cameras.
+        #  Don't reset the hardware trigger state in that case.
+        if self.received_mask != self.all_cameras_mask:
+            super().TriggerCameras()
+            return
+
         #  if any cameras are hardware triggered we have to track some other info
         if self.hwTriggered:
             #  reset the image received state for hardware triggered cameras
             #  The CamtrawlController v2 has 2 trigger ports
             self.ctcTriggerChannel = [False] * 2
             self.maxExposure = 0
-            for c in self.hw_triggered_cameras:
-                self.readyToTrigger[c] = False
-                self.HWTriggerHDR[c] = False
+            self.hw_ready_mask = 0
+            self.hw_hdr_mask = 0
 
         # call the base class's TriggerCameras method
         super().TriggerCameras()
@@ -618,11 +628,13 @@ class CamtrawlAcquisition(AcquisitionBase):
         '''
 
         #  for debugging, indicate that this camera is ready
-        self.logger.debug(cam.camera_name + ":  Ready to hardware trigger")
+        self.log_debug("%s:  Ready to hardware trigger", cam.camera_name)
 
         #  update some state info for this camera
-        self.readyToTrigger[cam] = True
-        self.HWTriggerHDR[cam] = is_HDR
+        cam_bit = self.camera_bits[cam.camera_name]
+        self.hw_ready_mask |= cam_bit
+        if is_HDR:
+            self.hw_hdr_mask |= cam_bit
 
         #  if this camera is set to trigger the exposure will be greater than zero.
         if exposure_us > 0:
@@ -631,16 +643,16 @@ class CamtrawlAcquisition(AcquisitionBase):
             #  one when indexing the list.
             self.ctcTriggerChannel[self.controller_port[cam] - 1] = True
         else:
-            #  If this camera is not going to be triggered, we set self.received
-            #  for this camera to True so we don't wait for it.
-            self.received[cam.camera_name] = True
+            #  If this camera is not going to be triggered, it will not emit the
+            #  triggerComplete signal so we mark it as complete.
+            self.received_mask |= cam_bit
 
         #  track the longest camera exposure - this ends up being our strobe exposure
         if self.maxExposure < exposure_us:
             self.maxExposure = exposure_us
 
         #  if all of the HW triggered cameras are ready, we trigger them
-        if all(self.readyToTrigger.values()):
+        if self.hw_ready_mask == self.hw_triggered_mask:
 
             #  strobe pre-fire is the time, in microseconds, that the strobe
             #  trigger signal goes high before the cameras are triggered. This
@@ -649,7 +661,7 @@ class CamtrawlAcquisition(AcquisitionBase):
             #  strobe pre fire for HDR exposures
 
             #  disable strobe pre-fire for HDR exposures 2,3 and 4
-            if any(self.HWTriggerHDR.values()):
+            if self.hw_hdr_mask:
                 strobePreFire = 0
             else:
                 #  not an HDR trigger so we use the configured pre-fire
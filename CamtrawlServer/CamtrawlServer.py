@@ -474,6 +474,18 @@ class CamtrawlServer(QtCore.QObject):
                 self.sendImage(thisRequest, thisSocket)
 
 
+    @QtCore.pyqtSlot(dict)
+    def newImagesAvailable(self, images):
+        '''
+        The newImagesAvailable slot accepts images from multiple cameras at once.
+        images is a dict keyed by camera name containing (label, image_data) tuples.
+        See newImageAvailable for the contents of image_data.
+        '''
+
+        for camera_name, (label, image_data) in images.items():
+            self.newImageAvailable(camera_name, label, image_data)
+
+
     @QtCore.pyqtSlot()
     def stopServer(self):
 
@@ -35,11 +35,17 @@
 import os
 import sys
 import argparse
+import subprocess
 import collections
 import yaml
 from PyQt5 import QtCore
 import CamtrawlController
 
+#  use the LibYAML based loader if PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 class CamtrawlStartup(QtCore.QObject):
 
@@ -83,10 +89,7 @@ class CamtrawlStartup(QtCore.QObject):
         #  continue the setup after QtCore.QCoreApplication.exec_() is called
         #  by using a timer to call StartSetup. This ensures that the
         #  application event loop is running as we continue setup.
-        startTimer = QtCore.QTimer(self)
-        startTimer.timeout.connect(self.StartSetup)
-        startTimer.setSingleShot(True)
-        startTimer.start(0)
+        QtCore.QTimer.singleShot(0, self.StartSetup)
 
 
     def StartSetup(self):
@@ -191,13 +194,16 @@ class CamtrawlStartup(QtCore.QObject):
         '''
 
         if sys.platform == "win32":
-            cmdString = None
+            cmdArgs = None
         else:
-            cmdString = 'rfkill block all'
+            cmdArgs = ['rfkill', 'block', 'all']
 
-        #  execute rfkill
-        if (cmdString):
-            os.system(cmdString)
+        #  execute rfkill - a missing or failing rfkill shouldn't stop startup
+        if (cmdArgs):
+            try:
+                subprocess.run(cmdArgs)
+            except OSError as e:
+                print("Unable to disable WiFi: " + str(e))
 
 
     def syncClock(self):
@@ -205,19 +211,22 @@ class CamtrawlStartup(QtCore.QObject):
         syncClock calls the platform specific NTP clock sync script
         '''
 
-        if sys.platform == "win32":
-            cmdString = (self.WIN_SYNC_SCRIPT + ' ' +
-                    self.configuration['system']['ntp_server_address'])
-        else:
-            #  when this is changed to use subprocess remove the '&' argument
-            cmdString = (self.LINUX_SYNC_SCRIPT + ' ' +
-                        self.configuration['system']['ntp_server_address'] + ' &')
-
-        # TODO: This needs to be changed to use subprocess.popen instead of os.system
-        #       so windows sync will not block.
-
-        #  run the time sync script
-        os.system(cmdString)
+        #  run the time sync script in the background. It is started in its own
+        #  process group/session so it keeps running after we exit. A missing or
+        #  non-executable script shouldn't stop startup.
+        try:
+            if sys.platform == "win32":
+                subprocess.Popen([self.WIN_SYNC_SCRIPT,
+                        self.configuration['system']['ntp_server_address']],
+                        creationflags=subprocess.DETACHED_PROCESS |
+                        subprocess.CREATE_NEW_PROCESS_GROUP)
+            else:
+                subprocess.Popen([self.LINUX_SYNC_SCRIPT,
+                        self.configuration['system']['ntp_server_address']],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                        start_new_session=True)
+        except OSError as e:
+            print("Unable to run the clock sync script: " + str(e))
 
 
     @QtCore.pyqtSlot()
@@ -278,11 +287,12 @@ class CamtrawlStartup(QtCore.QObject):
         '''
 
         #  read the configuration file
-        with open(config_file, 'r') as cf_file:
+        with open(config_file, 'rb') as cf_file:
             try:
-                config = yaml.safe_load(cf_file)
-            except:
-                pass
+                config = yaml.load(cf_file, Loader=_YamlLoader)
+            except yaml.YAMLError:
+                #  proceed with the defaults
+                config = None
 
         # Update/extend the configuration values and return
         return self.__update(config_dict, config)
@@ -290,20 +300,37 @@ class CamtrawlStartup(QtCore.QObject):
 
     def __update(self, d, u):
             """
-            Update a nested dictionary or similar mapping.
+            Update a nested dictionary or similar mapping. Nested mappings are
+            merged using a work list instead of recursion.
+
+            This must behave the same as AcquisitionBase._update_mapping. It is
+            duplicated here so the startup script doesn't import the acquisition
+            dependencies. Keep the two in sync.
 
-            Source: https://stackoverflow.com/questions/3232943/update-value-of-a-nested-dictionary-of-varying-depth
+            Based on: https://stackoverflow.com/questions/3232943/update-value-of-a-nested-dictionary-of-varying-depth
             Credit: Alex Martelli / Alex Telon
             """
-            for k, v in u.items():
-                if isinstance(v, collections.abc.Mapping):
-                    #  if a value is None, just assign the value, otherwise keep going
-                    if d.get(k, {}) is None:
-                        d[k] = v
+            stack = [(d, u)]
+            while stack:
+                dest, src = stack.pop()
+                if not src:
+                    #  nothing to merge at this level
+                    continue
+                leaves = {}
+                for k, v in src.items():
+                    if v.__class__ is dict or isinstance(v, collections.abc.Mapping):
+                        existing = dest.get(k, {})
+                        if not (existing.__class__ is dict or
+                                isinstance(existing, collections.abc.Mapping)):
+                            #  if a value is None (or not a mapping), just assign the value
+                            dest[k] = v
+                        else:
+                            #  otherwise keep going
+                            dest[k] = existing
+                            stack.append((existing, v))
                     else:
-                        d[k] = self.__update(d.get(k, {}), v)
-                else:
-                    d[k] = v
+                        leaves[k] = v
+                dest.update(leaves)
             return d
 
 
@@ -195,8 +195,10 @@ class ImageWriter(QtCore.QObject):
                 # increase the video frame counter
                 self.frame_number = self.frame_number + 1
 
-                # pass the image data to ffmpeg
-                self.ffmpeg_process.stdin.write(scaled_image.tobytes())
+                # pass the image data to ffmpeg. The array's buffer is written directly
+                # so we don't make a copy of the frame. ascontiguousarray only copies
+                # if the image isn't already contiguous.
+                self.ffmpeg_process.stdin.write(np.ascontiguousarray(scaled_image).data)
 
                 # emit the write complete signal
                 self.writeComplete.emit(self.camera_name, self.filename)
@@ -240,8 +242,8 @@ class ImageWriter(QtCore.QObject):
                 #  no path passed, we're using whatever is on the system path
                 command_args[0] = command_args[0]
             else:
-                #  we've been passed a path so we need to add the separator
-                command_args[0] = self.video_options["ffmpeg_path"] + os.sep + command_args[0]
+                #  we've been passed a path so we need to join it with the executable
+                command_args[0] = os.path.join(self.video_options["ffmpeg_path"], command_args[0])
 
             if self.video_options["ffmpeg_debug_out"]:
                 out_filename = os.path.splitext(filename)[0] + '_debug.txt'
@@ -123,7 +123,9 @@ class SpinCamera(QtCore.QObject):
         self.hdr_images = [None] * 4
         self.acquiring = False
         self.save_path = '.'
-        self.date_format = "D%Y%m%d-T%H%M%S.%f"
+        self.date_format = "D%Y%m%d-T%H%M%S"
+        self.last_time_sec = None
+        self.last_time_str = ''
         self.trig_timestamp = None
         self.trigger_mode = PySpin.TriggerSource_Software
         self.n_triggered = 0
@@ -395,8 +397,16 @@ class SpinCamera(QtCore.QObject):
             num_str = '%06d' % image_number
         self.image_num_str = num_str
 
-        #  generate the time string
-        time_str = timestamp.strftime(self.date_format)[:-3]
+        #  generate the time string. The date and time are only formatted when the
+        #  second changes and the milliseconds are appended.
+        time_sec = timestamp.replace(microsecond=0)
+        if time_sec != self.last_time_sec:
+            self.last_time_sec = time_sec
+            self.last_time_str = time_sec.strftime(self.date_format)
+        time_str = '%s.%03d' % (self.last_time_str, timestamp.microsecond // 1000)
+
+        #  build the path and file name shared by all of this trigger's images
+        base_filename = '%s%s_%s_%s' % (self.save_path, num_str, time_str, self.camera_id)
 
         #  generate the filename(s) and
         if (self.hdr_enabled):
@@ -405,8 +415,7 @@ class SpinCamera(QtCore.QObject):
             for e in self.hdr_parameters:
                 exp_str = '%d-%d-%d' % (n, self.hdr_parameters[e]['exposure'],
                     self.hdr_parameters[e]['gain'])
-                self.filenames.append(self.save_path + num_str + '_' + time_str +
-                    '_' + self.camera_id + '_HDR-' + exp_str)
+                self.filenames.append(base_filename + '_HDR-' + exp_str)
 
                 self.exposures.append(self.hdr_parameters[e]['exposure'])
                 if emit_signal:
@@ -423,8 +432,7 @@ class SpinCamera(QtCore.QObject):
             if (self.hdr_save_merged and save_image) or \
                 (self.hdr_signal_merged and emit_signal):
 
-                self.hdr_merged_filename = (self.save_path + num_str + '_' + time_str +
-                    '_' + self.camera_id + '_HDR-merged')
+                self.hdr_merged_filename = base_filename + '_HDR-merged'
                 if save_image:
                     self.save_hdr = self.hdr_save_merged
                 if emit_signal:
@@ -433,8 +441,7 @@ class SpinCamera(QtCore.QObject):
         else:
             #  single images follow the "standard" camtrawl naming convention
             self.do_signals.append(emit_signal)
-            self.filenames.append(self.save_path + num_str + '_' + time_str +
-                    '_' + self.camera_id)
+            self.filenames.append(base_filename)
 
             self.exposures.append(self.exposure)
             if emit_signal:
@@ -609,7 +616,8 @@ class SpinCamera(QtCore.QObject):
                     exposures.append(1.0 / (image['exposure'] / 1000000.))
                 exposures = np.array(exposures, dtype=np.float32)
 
-                if self.hdr_merge_method.lower() == 'mertens':
+                merge_method = self.hdr_merge_method.lower()
+                if merge_method == 'mertens':
                     #  mertens (at least how it is implemented here) performs image fusion
                     #  and does not generate a true HDR iamge
                     merge_mertens = cv2.createMergeMertens()
@@ -634,7 +642,7 @@ class SpinCamera(QtCore.QObject):
 
                     merged_image['is_hdr'] = False
 
-                elif self.hdr_merge_method.lower() == 'debevec':
+                elif merge_method == 'debevec':
                     if self.dbResponse is None:
                         calibrateDebevec = cv2.createCalibrateDebevec()
                         self.dbResponse = calibrateDebevec.process(images, exposures)
@@ -647,7 +655,7 @@ class SpinCamera(QtCore.QObject):
 
                     merged_image['is_hdr'] = True
 
-                elif self.hdr_merge_method.lower() == 'robertson':
+                elif merge_method == 'robertson':
                     merge_robertson = cv2.createMergeRobertson()
                     hdr_data = merge_robertson.process(images, times=exposures)
                     tonemap = cv2.createTonemap(gamma=1.5)
@@ -1000,7 +1008,7 @@ class SpinCamera(QtCore.QObject):
         self.n_triggered = 0
 
         #  set up the file logging directory - create if needed
-        self.save_path = os.path.normpath(file_path) + os.sep + self.camera_name + os.sep
+        self.save_path = os.path.join(os.path.normpath(file_path), self.camera_name, '')
 
         try:
             if not os.path.exists(self.save_path):
@@ -3,25 +3,55 @@ metadata_db is a simple interface to the camtrawl metadata database.
 '''
 
 import os
+import datetime
 from PyQt5 import QtCore, QtSql
 
 
 class metadata_db(QtCore.QObject):
 
-    def __init__(self, parent=None):
+    #  the statements used to insert the per-trigger and sensor data. These are
+    #  prepared once per connection and the values are bound when executed.
+    INSERT_IMAGE_SQL = "INSERT INTO images VALUES(?,?,?,?,?,?,?,?,?,?)"
+    INSERT_DROPPED_SQL = "INSERT INTO dropped VALUES(?,?,?)"
+    INSERT_SYNC_SQL = "INSERT INTO sensor_data VALUES(?,?,?,?,?)"
+    INSERT_ASYNC_SQL = "INSERT INTO async_data VALUES(?,?,?,?)"
+
+    def __init__(self, connection_name=None, parent=None):
 
         super(metadata_db, self).__init__(parent)
 
-        self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE")
+        #  Qt database connections can only be used in the thread that created
+        #  them. Instances used in other threads must provide a connection name.
+        #  The owning thread must call close() since the connection can't be
+        #  closed from another thread at exit.
+        if connection_name:
+            self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE", connection_name)
+        else:
+            self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE")
         self.is_open = False
+        self.db_file = None
+
+        #  prepared queries keyed by their SQL statement
+        self.queries = {}
+
+        #  the last datetime converted by datetime_to_db_str and its string. All
+        #  of the rows for a trigger share the same trigger time.
+        self.last_dt = None
+        self.last_dt_str = ''
+        self.last_dt_sec = None
+        self.last_dt_sec_str = ''
 
 
     def open(self, db_file):
 
         db_file = os.path.normpath(db_file)
+        self.db_file = db_file
         self.db.setDatabaseName(db_file)
 
         if self.db.open():
+            #  configure the connection
+            self.set_pragmas()
+
             #  check if this is a new or existing database file
             if (not 'cameras' in self.db.tables()):
                 #  we'll assume if the cameras table doesn't exist, then this is a new
@@ -29,11 +59,58 @@ class metadata_db(QtCore.QObject):
                 self.create_database()
             self.is_open = True
         else:
+            #  release anything left over from the failed open
+            self.db.close()
             self.is_open = False
 
         return self.is_open
 
 
+    def set_pragmas(self):
+        '''
+        set_pragmas configures the SQLite connection. Write-ahead logging with
+        synchronous=NORMAL only syncs the WAL file at checkpoints instead of
+        syncing the rollback journal and db file every commit. The database
+        remains consistent after a crash but the last few commits may be lost
+        if the OS crashes or power is lost. The database is written from more
+        than one connection so we wait on locks instead of failing. Reads are
+        memory mapped.
+
+        In memory databases don't have a file to journal or map so only the
+        cache settings are applied to them.
+        '''
+
+        sql = ["PRAGMA temp_store=MEMORY",
+               "PRAGMA cache_size=-20000"]
+        if self.db_file != ':memory:':
+            sql += ["PRAGMA journal_mode=WAL",
+                    "PRAGMA busy_timeout=5000",
+                    "PRAGMA synchronous=NORMAL",
+                    "PRAGMA mmap_size=67108864"]
+
+        for s in sql:
+            query = QtSql.QSqlQuery(s, self.db)
+            query.exec_()
+
+
+    def exec_prepared(self, sql, values):
+        '''
+        exec_prepared binds the provided values to the prepared query for the
+        provided SQL statement and executes it. Queries are prepared the first
+        time they are used and reused after that.
+        '''
+
+        query = self.queries.get(sql)
+        if query is None:
+            query = QtSql.QSqlQuery(self.db)
+            query.prepare(sql)
+            self.queries[sql] = query
+
+        for i, value in enumerate(values):
+            query.bindValue(i, value)
+        query.exec_()
+
+
     def update_camera(self, name, device_id, serial, label, rot, version, speed):
         '''
         update_camera updates this camera's info in the cameras table. The camera is
@@ -59,16 +136,44 @@ class metadata_db(QtCore.QObject):
         query.exec_()
 
 
+    def update_cameras(self, camera_rows, image_ext=None, video_ext=None):
+        '''
+        update_cameras adds or updates multiple cameras within a single transaction.
+        camera_rows is a list of tuples containing the update_camera arguments. If
+        provided, the image and video file extensions are written in the same
+        transaction.
+        '''
+
+        self.db.transaction()
+        for row in camera_rows:
+            self.update_camera(*row)
+        if image_ext is not None:
+            self.set_image_extension(image_ext)
+        if video_ext is not None:
+            self.set_video_extension(video_ext)
+        self.db.commit()
+
+
     def insert_async_data(self, sensor_id, header, rx_time, data):
         '''
         insert_async_data inserts a row in the async_data table
         '''
 
         time_str = self.datetime_to_db_str(rx_time)
-        sql = ("INSERT INTO async_data VALUES('" + time_str + "','" + sensor_id + "','" + header +
-                "','" + data + "')" )
-        query = QtSql.QSqlQuery(sql, self.db)
-        query.exec_()
+        self.exec_prepared(self.INSERT_ASYNC_SQL, (time_str, sensor_id, header, data))
+
+
+    def insert_async_data_many(self, async_rows):
+        '''
+        insert_async_data_many inserts multiple rows in the async_data table within
+        a single transaction. async_rows is a list of tuples containing the
+        insert_async_data arguments.
+        '''
+
+        self.db.transaction()
+        for row in async_rows:
+            self.insert_async_data(*row)
+        self.db.commit()
 
 
     def insert_sync_data(self, image_num, rx_time, sensor_id, header, data):
@@ -77,10 +182,7 @@ class metadata_db(QtCore.QObject):
         '''
 
         time_str = self.datetime_to_db_str(rx_time)
-        sql = ("INSERT INTO sensor_data VALUES(" + str(image_num) + ",'" + time_str + "','" +
-                sensor_id + "','" + header + "','" + data + "')")
-        query = QtSql.QSqlQuery(sql, self.db)
-        query.exec_()
+        self.exec_prepared(self.INSERT_SYNC_SQL, (image_num, time_str, sensor_id, header, data))
 
 
     def get_next_image_number(self):
@@ -107,20 +209,17 @@ class metadata_db(QtCore.QObject):
         '''
 
         time_str = self.datetime_to_db_str(trig_time)
-        sql = ("INSERT INTO dropped VALUES(" + str(image_num) + ",'" + cam_name + "','" + time_str + "')")
-        query = QtSql.QSqlQuery(sql, self.db)
-        query.exec_()
+        self.exec_prepared(self.INSERT_DROPPED_SQL, (image_num, cam_name, time_str))
 
 
     def add_image(self, image_num, cam_name, trig_time, image_filename, exposure,
             gain, save_still, save_frame, discarded=None, md5=None):
 
+        #  None is written as NULL
         if not md5:
-            md5 = 'NULL'
-        else:
-            md5 = "'" + md5 + "'"
+            md5 = None
         if not discarded:
-            discarded = 'NULL'
+            discarded = None
         else:
             discarded = 1
 
@@ -129,11 +228,27 @@ class metadata_db(QtCore.QObject):
         save_frame = int(save_frame)
 
         time_str = self.datetime_to_db_str(trig_time)
-        sql = ("INSERT INTO images VALUES(" + str(image_num) + ",'" + cam_name + "','" + time_str + "','" +
-                image_filename + "'," + str(exposure) + "," + str(gain) + "," + str(save_still) + ',' +
-                str(save_frame) + ',' + str(discarded) + ',' + md5 + ")")
-        query = QtSql.QSqlQuery(sql, self.db)
-        query.exec_()
+        self.exec_prepared(self.INSERT_IMAGE_SQL, (image_num, cam_name, time_str, image_filename,
+                exposure, gain, save_still, save_frame, discarded, md5))
+
+
+    def add_images(self, image_rows, dropped_rows, sensor_rows=()):
+        '''
+        add_images inserts multiple entries in the images, dropped, and sensor_data
+        tables within a single transaction. image_rows is a list of tuples containing
+        the add_image arguments, dropped_rows is a list of tuples containing the
+        add_dropped arguments, and sensor_rows is a list of tuples containing the
+        insert_sync_data arguments.
+        '''
+
+        self.db.transaction()
+        for row in image_rows:
+            self.add_image(*row)
+        for row in dropped_rows:
+            self.add_dropped(*row)
+        for row in sensor_rows:
+            self.insert_sync_data(*row)
+        self.db.commit()
 
 
     def set_image_extension(self, extension):
@@ -153,14 +268,29 @@ class metadata_db(QtCore.QObject):
 
 
     def datetime_to_db_str(self, dt_obj):
+        '''
+        datetime_to_db_str returns the provided datetime as a string in the form
+        YYYY-MM-DD HH:MM:SS.mmm. The milliseconds are rounded, not truncated. The
+        last conversion is cached since the images, dropped images, and sensor data
+        for a trigger all share the trigger time. The date and time are only
+        formatted when the second changes.
+        '''
 
-        dt_string = dt_obj.strftime("%Y-%m-%d %H:%M:%S")
-        dt_string = dt_string + '.%03d' % (round(dt_obj.microsecond / 1000))
+        if dt_obj != self.last_dt:
+            self.last_dt = dt_obj
+            dt_sec = dt_obj.replace(microsecond=0)
+            if dt_sec != self.last_dt_sec:
+                self.last_dt_sec = dt_sec
+                self.last_dt_sec_str = dt_sec.strftime("%Y-%m-%d %H:%M:%S")
+            self.last_dt_str = '%s.%03d' % (self.last_dt_sec_str,
+                    round(dt_obj.microsecond / 1000))
 
-        return dt_string
+        return self.last_dt_str
 
 
     def close(self):
+        #  the prepared queries must be released before the connection is closed
+        self.queries = {}
         self.db.close()
         self.is_open = False
 
@@ -179,3 +309,92 @@ class metadata_db(QtCore.QObject):
         for s in sql:
             query = QtSql.QSqlQuery(s, self.db)
             query.exec_()
+
+
+class metadata_writer(QtCore.QObject):
+    '''
+    metadata_writer writes the image, dropped, and sensor data entries to the
+    metadata database from its own thread so database IO doesn't hold up the
+    main thread. Create it, move it to a QThread, and connect the thread's started
+    signal to start_writer. The write slots should be connected using queued
+    connections and close should be connected using a blocking queued connection
+    so all queued entries are written before it returns.
+
+    Async sensor data is buffered and written in a single transaction every
+    FLUSH_INTERVAL ms.
+    '''
+
+    FLUSH_INTERVAL = 100
+
+    def __init__(self, db_file, parent=None):
+
+        super(metadata_writer, self).__init__(parent)
+
+        self.db_file = db_file
+        self.db = None
+        self.pending_async = []
+
+        #  this timer moves to the writer thread with us
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(self.FLUSH_INTERVAL)
+        self.flushTimer.timeout.connect(self.flush_async_data)
+
+
+    @QtCore.pyqtSlot()
+    def start_writer(self):
+        '''
+        start_writer opens our connection to the database file. It must be called
+        in the writer thread.
+        '''
+
+        self.db = metadata_db(connection_name='metadata_writer')
+        self.db.open(self.db_file)
+
+
+    @QtCore.pyqtSlot(list, list, list)
+    def add_images(self, image_rows, dropped_rows, sensor_rows):
+        '''
+        add_images writes the provided images, dropped, and sensor_data entries in
+        a single transaction. See metadata_db.add_images.
+        '''
+
+        if self.db is not None and self.db.is_open:
+            self.db.add_images(image_rows, dropped_rows, sensor_rows)
+
+
+    @QtCore.pyqtSlot(str, str, datetime.datetime, str)
+    def insert_async_data(self, sensor_id, header, rx_time, data):
+        '''
+        insert_async_data queues a row for the async_data table. Queued rows are
+        written when the flush timer expires.
+        '''
+
+        self.pending_async.append((sensor_id, header, rx_time, data))
+        if not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+
+    @QtCore.pyqtSlot()
+    def flush_async_data(self):
+        '''
+        flush_async_data writes the queued async_data rows in a single transaction.
+        '''
+
+        if self.pending_async:
+            if self.db is not None and self.db.is_open:
+                self.db.insert_async_data_many(self.pending_async)
+            self.pending_async = []
+
+
+    @QtCore.pyqtSlot()
+    def close(self):
+        '''
+        close writes any queued async data and closes our database connection.
+        '''
+
+        self.flushTimer.stop()
+        self.flush_async_data()
+        if self.db is not None:
+            self.db.close()
+            self.db = None